@@ -1,3 +1,6 @@
 from .elaboration import elaborate, elaborate_file
 from .hls import Component, Bus
-from .backend.python.core.buses import BitBusValue
+from .backend.python.core.buses import BitBusValue, OscillationError, SimulationError
+from .wavefile import WaveFileReader, WaveFileWriter
+from .waves import WaveStore
+from .async_testbench import AsyncTestBench
@@ -0,0 +1,229 @@
+"""
+This module has the test bench driven by asyncio, so many simulations and asyncio based models
+run interleaved in a single thread.
+"""
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Sequence
+
+from .testbench import TestBench
+
+Stimulus = tuple[int, dict[str, str | int]]  # The time waited before the new values of the inputs
+
+# The prefix of the monitors that wake the coroutines waiting for a bus.
+WAITER_PREFIX = 'waiter@'
+
+
+class AsyncTestBench:
+    """This class drives a test bench from coroutines.
+
+    Each test bench has its own simulated time. The updates and waits yield to the event loop, so
+    the other test benches and models run between them, and the coroutines can await the changes
+    of the bit buses. The buses awaited are watched by monitors of the wrapped test bench, so the
+    coroutines are woken by any change checked by them, including each row of `play` and
+    `replay`, and the sweeps and the writes through ports wake them too. The other attributes,
+    like `save_vcd` or `waves`, are the ones of the wrapped test bench.
+    """
+    def __init__(self, bench: TestBench) -> None:
+        self.bench = bench
+        # The futures waiting for each bus, with the value of the bus when they started and the
+        # value they wait for, any other one when None. They get the time and the new value.
+        self.waiters: dict[str, list[tuple[int, Optional[int], asyncio.Future]]] = {}
+        self.watched: set[str] = set()  # The buses with a monitor that wakes their waiters
+        self.ports: dict[str, Any] = {}
+        self.widths: dict[str, int] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.bench, name)
+
+    def __str__(self) -> str:
+        return self.bench.__str__()
+
+    def __enter__(self) -> 'AsyncTestBench':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.bench.close()
+
+    def read(self, id: str) -> int:
+        """This method returns the value of a bit bus as an int."""
+        if id not in self.ports:
+            self.ports[id] = self.bench.port(id)
+
+        return self.ports[id].read()
+
+    async def wait(self, time: int) -> None:
+        """This method waits for a certain time and lets the other coroutines run."""
+        self.bench.wait(time)
+        await asyncio.sleep(0)
+
+    async def update(self, new_values: dict[str, str | int]) -> None:
+        """
+        This method updates the inputs of the component, as `TestBench.update`, wakes the
+        coroutines waiting for the buses that changed and lets the other coroutines run.
+
+        The values can be strings or ints, the first bit is the most significant one.
+        """
+        self.apply(new_values)
+        await asyncio.sleep(0)
+
+    def apply(self, new_values: dict[str, str | int]) -> None:
+        """This method updates the inputs, the monitors resolve the futures of the buses."""
+        self.bench.update(self.bench.to_strings(new_values, self.widths))
+
+    def notify(self, id: str, value: int) -> bool:
+        """
+        This method resolves the futures of a bus waiting for its new value, checked on each
+        change, so a value the bus only had inside a `play` or between two resumes isn't missed.
+        """
+        waiters = self.waiters.get(id)
+
+        if not waiters:
+            return True
+
+        pending = []
+
+        for start, target, future in waiters:
+            if future.done():
+                continue
+
+            reached = value != start if target is None else value == target
+
+            if reached:
+                future.set_result((self.bench.s_time, value))
+            else:
+                pending.append((start, target, future))
+
+        if pending:
+            self.waiters[id] = pending
+        else:
+            del self.waiters[id]
+
+        return True  # The monitors of the waiters never fail
+
+    def wake(self) -> None:
+        """This method resolves the futures of the buses changed without checking the monitors."""
+        for id in list(self.waiters):
+            self.notify(id, self.read(id))
+
+    def run_batch(
+        self, inputs: dict[str, Sequence[int]], outputs: list[str] | None = None
+    ) -> dict[str, Any]:
+        """This method simulates a batch, as `TestBench.run_batch`, and wakes the coroutines."""
+        try:
+            return self.bench.run_batch(inputs, outputs)
+        finally:
+            self.wake()
+
+    def sweep(
+        self, inputs: list[str] | None = None, outputs: list[str] | None = None
+    ) -> Iterator[tuple[int, dict[str, int]]]:
+        """
+        This method goes through the combinations of the inputs, as `TestBench.sweep`, waking
+        the coroutines after each one.
+        """
+        try:
+            for item in self.bench.sweep(inputs, outputs):
+                self.wake()
+                yield item
+        finally:
+            self.wake()
+
+    def port(self, id: str) -> 'AsyncPort':
+        """This method returns a handle to a bus, whose writes wake the coroutines."""
+        return AsyncPort(self, self.bench.port(id))
+
+    async def changed(self, id: str) -> int:
+        """This method waits for the next change of a bit bus, returning its new value."""
+        return (await self.next_change(id))[1]
+
+    def next_change(self, id: str, target: Optional[int] = None) -> asyncio.Future:
+        """
+        This method returns a future with the time and the new value of the next change of a bus,
+        or of the next change to `target` when given.
+        """
+        if id not in self.watched:
+            self.watched.add(id)
+            self.bench.monitor(f'{WAITER_PREFIX}{id}', [id], lambda value: self.notify(id, value))
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(id, []).append((self.read(id), target, future))
+
+        return future
+
+    async def wait_for(self, id: str, value: int) -> int:
+        """
+        This method waits until a bit bus has a value, returning the time it was reached.
+
+        The time is the one of the change, even if the coroutine resumes after the test bench
+        moved on, and a value the bus only had between two resumes isn't missed.
+        """
+        if self.read(id) == value:
+            return self.bench.s_time
+
+        time, _ = await self.next_change(id, value)
+
+        return time
+
+    async def run(
+        self,
+        stimuli: Iterable[Stimulus] | AsyncIterable[Stimulus],
+        outputs: list[str] | None = None,
+    ) -> AsyncIterator[tuple[int, dict[str, int]]]:
+        """
+        This method simulates a stream of stimuli, as `TestBench.run`, yielding to the event loop
+        after each one.
+
+        Args:
+            stimuli (iterable): The stimuli, as the time to wait before each one and the new values
+                of the inputs, from an iterable or an async iterable.
+            outputs (list): The buses to read, all of them except the inputs by default.
+
+        Yields:
+            tuple: The time of the stimulus and the values of the outputs as ints.
+        """
+        bench = self.bench
+
+        if outputs is None:
+            outputs = bench.get_outputs(bench.component.get_inputs())
+
+        ports = [(id, bench.port(id)) for id in outputs]
+
+        async def items() -> AsyncIterator[Stimulus]:
+            if isinstance(stimuli, AsyncIterable):
+                async for stimulus in stimuli:
+                    yield stimulus
+            else:
+                for stimulus in stimuli:
+                    yield stimulus
+
+        async for delay, inputs in items():
+            bench.wait(delay)
+            self.apply(inputs)
+
+            yield bench.s_time, {id: port.read() for id, port in ports}
+
+            await asyncio.sleep(0)
+
+
+class AsyncPort:
+    """This class is a handle to a bus of an async test bench, see `TestBench.port`.
+
+    The writes wake the coroutines waiting for the buses that changed.
+    """
+    def __init__(self, bench: AsyncTestBench, port: Any) -> None:
+        self.bench = bench
+        self.port = port
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.port, name)
+
+    def __repr__(self) -> str:
+        return repr(self.port)
+
+    def write(self, value: int) -> None:
+        self.port.write(value)
+        self.bench.wake()
+
+    def write_bytes(self, data: bytes) -> None:
+        self.port.write_bytes(data)
+        self.bench.wake()
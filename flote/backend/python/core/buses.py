@@ -13,6 +13,16 @@ class Evaluator(ABC):
         """Evaluate the expression."""
         pass
 
+    @abstractmethod
+    def evaluate_lanes(self, planes: dict['BaseBus', list[int]], mask: int) -> list[int]:
+        """Evaluate the expression for many stimuli at once, one in each bit lane.
+
+        Args:
+            planes (dict): The planes of the values of the buses, see `lanes.pack_lanes`.
+            mask (int): The plane with all the lanes set.
+        """
+        pass
+
 
 class SimulationError(Exception):
     """This class represents an error in the simulation."""
@@ -23,6 +33,16 @@ class SimulationError(Exception):
         return self.message
 
 
+class OscillationError(SimulationError):
+    """This class represents a feedback loop that doesn't stabilize."""
+    def __init__(self, bus_ids: list[str], iterations: int) -> None:
+        super().__init__(
+            f'The buses {bus_ids} did not stabilize after {iterations} iterations.'
+        )
+        self.bus_ids = bus_ids
+        self.iterations = iterations
+
+
 class BaseBus(ABC):
     """This is the base class for all buses."""
     def __init__(self) -> None:
@@ -31,6 +51,10 @@ class BaseBus(ABC):
         self.value: Any = None
         # The list of buses that the current bus depends on.
         self.influence_list: list['BaseBus'] = []
+        # The topological rank of the bus in the influence graph.
+        self.rank: Optional[int] = None
+        # The index of the feedback loop (strongly connected component) of the bus, if any.
+        self.scc: Optional[int] = None
 
     @abstractmethod
     def assign(self) -> None:
@@ -143,57 +167,124 @@ class Bus(BaseBus):
 
 
 class BitBusValue(BusValue[list[bool]]):
-    """This class represents a value of a BitBus."""
+    """This class represents a value of a BitBus.
+
+    The bits are packed in a Python int (`bits`) together with the number of bits of the value
+    (`width`). The first bit of the bus is the most significant bit of the int, so slicing,
+    concatenation and the logic operators are single shift/mask operations.
+    """
+    def __init__(self, value: list[bool] | str | None = None) -> None:
+        if value is None:
+            value = self.get_default()
+
+        if isinstance(value, str):
+            value = value.strip('"')
+            self.bits = int(value, 2) if value else 0
+        else:
+            self.bits = int(''.join(['1' if bit else '0' for bit in value]) or '0', 2)
+
+        self.width = len(value)
+
+    @classmethod
+    def from_int(cls, bits: int, width: int) -> 'BitBusValue':
+        """Get the value with the given packed bits and width.
+
+        The bits must already fit in the width. Narrow values are interned, so no new object is
+        created for them.
+        """
+        if width <= INTERNED_WIDTH:
+            return INTERNED_VALUES[width][bits]
+
+        return cls._new(bits, width)
+
+    @classmethod
+    def _new(cls, bits: int, width: int) -> 'BitBusValue':
+        value = cls.__new__(cls)
+        value.bits = bits
+        value.width = width
+
+        return value
+
+    @property
+    def raw_value(self) -> list[bool]:
+        return [bit == '1' for bit in self.get_vcd_repr()]
+
     def __repr__(self) -> str:
         return f'{self.raw_value}'
 
-    def get_vcd_repr(self) -> str:
-        value = ''.join(['1' if bit else '0' for bit in self.raw_value])
+    def __hash__(self) -> int:
+        return hash((self.bits, self.width))
 
-        return value
+    def get_vcd_repr(self) -> str:
+        return format(self.bits, f'0{self.width}b') if self.width else ''
 
     def get_default(self) -> list[bool]:
         return [False]
 
     #* Operators overloading
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, BitBusValue):
             return NotImplemented
-        return self.raw_value == other.raw_value
+        return self.bits == other.bits and self.width == other.width
+
+    def __getitem__(self, index: slice | int) -> 'BitBusValue':
+        width = self.width
+
+        if isinstance(index, int):
+            index = slice(index, (index + 1) or None)
+
+        start, stop, step = index.indices(width)
 
-    def __getitem__(self, slice: slice) -> 'BitBusValue':
-        return BitBusValue(self.raw_value[slice])
+        if step != 1:
+            return BitBusValue(self.raw_value[index])
 
-    def __add__(self, other: 'BusValue[list[bool]]') -> 'BitBusValue':
-        return BitBusValue(self.raw_value + other.raw_value)
+        if start == 0 and stop == width:
+            return self
+
+        size = max(stop - start, 0)
+
+        return BitBusValue.from_int((self.bits >> (width - start - size)) & ((1 << size) - 1), size)
+
+    def __add__(self, other: 'BitBusValue') -> 'BitBusValue':
+        return BitBusValue.from_int((self.bits << other.width) | other.bits, self.width + other.width)
 
     def __invert__(self) -> 'BitBusValue':
-        return BitBusValue([not bit for bit in self.raw_value])
+        return BitBusValue.from_int(self.bits ^ ((1 << self.width) - 1), self.width)
 
-    def __and__(self, other: 'BusValue[list[bool]]') -> 'BitBusValue':
-        return BitBusValue([a and b for a, b in zip(self.raw_value, other.raw_value)])
+    def __and__(self, other: 'BitBusValue') -> 'BitBusValue':
+        return BitBusValue.from_int(self.bits & other.bits, self.width)
 
-    def __or__(self, other: 'BusValue[list[bool]]') -> 'BitBusValue':
-        return BitBusValue([a or b for a, b in zip(self.raw_value, other.raw_value)])
+    def __or__(self, other: 'BitBusValue') -> 'BitBusValue':
+        return BitBusValue.from_int(self.bits | other.bits, self.width)
 
-    def __xor__(self, other: 'BusValue[list[bool]]') -> 'BitBusValue':
-        return BitBusValue([a ^ b for a, b in zip(self.raw_value, other.raw_value)])
+    def __xor__(self, other: 'BitBusValue') -> 'BitBusValue':
+        return BitBusValue.from_int(self.bits ^ other.bits, self.width)
     #* End of operators overloading
 
 
+# Every value up to this width is created once and shared by all buses.
+INTERNED_WIDTH = 8
+INTERNED_VALUES: list[list[BitBusValue]] = [
+    [BitBusValue._new(bits, width) for bits in range(1 << width)]
+    for width in range(INTERNED_WIDTH + 1)
+]
+
+
 class BitBus(Bus):
     """This class represents a bit bus in the circuit."""
     def get_default(self) -> BitBusValue:
         return BitBusValue()
 
     def set_dimension(self, dimension: int) -> None:
-        self.value = BitBusValue([False] * dimension)
+        self.value = BitBusValue.from_int(0, dimension)
 
     def get_valid_values(self) -> list[str]:
         return ['[01]+']
 
     def get_vcd_repr(self) -> str:
-        return ''.join(['1' if bit else '0' for bit in self.value.raw_value])
+        return self.value.get_vcd_repr()
 
     def insert_value(self, value: str) -> None:
         if not re.fullmatch(r'[01]+', value):
@@ -202,10 +293,10 @@ class BitBus(Bus):
                 f'{self.get_valid_values()}'
             )
 
-        if len(value) != len(self.value.raw_value):
+        if len(value) != self.value.width:
             raise SimulationError(
                 f'Invalid value "{value}". The value must have '
-                f'{len(self.value.raw_value)} bits.'
+                f'{self.value.width} bits.'
             )
 
-        self.value = BitBusValue([bool(int(bit)) for bit in value.strip('"')])
+        self.value = BitBusValue.from_int(int(value, 2), len(value))
@@ -0,0 +1,109 @@
+"""
+This module compiles the assignments of the intermediate representation (IR) to straight-line
+Python functions that work directly on the packed bits of the buses.
+"""
+from typing import Callable
+
+from .buses import BaseBus, BitBus, BitBusValue
+
+OPERATORS = {'and': '&', 'or': '|', 'xor': '^', 'nand': '&', 'nor': '|', 'xnor': '^'}
+
+
+class Compiler:
+    """Compile IR expressions to Python code and then to functions."""
+    def __init__(self, bus_dict: dict[str, BaseBus]) -> None:
+        self.bus_dict = bus_dict
+
+    def compile_assignment(self, bus_id: str, j_expr) -> tuple[Callable[[], BitBusValue], str]:
+        """Compile the assignment of a bus.
+
+        Args:
+            bus_id (str): The id of the assigned bus, used to name the generated code.
+            j_expr (dict): The intermediate representation of the assignment.
+
+        Returns:
+            tuple: The compiled function, that returns the new value of the bus, and its source.
+        """
+        refs: dict[str, str] = {}
+        expr, width = self.gen_expr(j_expr, refs)
+
+        params = ['from_int=from_int'] + [f'{name}={name}' for name in refs.values()]
+        lines = [f'def assign({", ".join(params)}):']
+
+        for ref_id, name in refs.items():
+            if isinstance(self.bus_dict[ref_id], BitBus):
+                lines.append(f'    {name}_bits = {name}.value.bits')
+
+        lines.append(f'    return from_int({expr}, {width})')
+        source = '\n'.join(lines) + '\n'
+
+        namespace = {'from_int': BitBusValue.from_int}
+        namespace |= {name: self.bus_dict[ref_id] for ref_id, name in refs.items()}
+        exec(compile(source, f'<flote assignment of {bus_id}>', 'exec'), namespace)
+
+        return namespace['assign'], source
+
+    def gen_expr(self, j_expr, refs: dict[str, str]) -> tuple[str, int]:
+        """Generate the Python expression that computes the packed bits of an IR expression.
+
+        Args:
+            j_expr (dict): The intermediate representation of the expression.
+            refs (dict): The names given to the referenced buses, filled while generating.
+
+        Returns:
+            tuple: The Python expression and the width of its result.
+        """
+        expr_type = j_expr['type']
+        args = j_expr['args']
+
+        if expr_type == 'const':
+            value = BitBusValue(args['value'])
+
+            return f'{value.bits}', value.width
+        elif expr_type == 'ref':
+            bus_id = args['id']
+            bus = self.bus_dict[bus_id]
+            name = refs.setdefault(bus_id, f'bus{len(refs)}')
+
+            slice_begin = args['slice_begin']
+            slice_end = args['slice_end']
+            width = slice_end - slice_begin + 1
+
+            if not isinstance(bus, BitBus):
+                return f'{name}.value[{slice_begin}:{slice_end + 1}].bits', width
+
+            bus_width = bus.value.width
+            shift = bus_width - slice_end - 1
+
+            if width == bus_width:
+                return f'{name}_bits', width
+            elif shift == 0:
+                return f'({name}_bits & {(1 << width) - 1})', width
+            else:
+                return f'(({name}_bits >> {shift}) & {(1 << width) - 1})', width
+        elif expr_type == 'not':
+            expr, width = self.gen_expr(args['expr'], refs)
+
+            return f'({expr} ^ {(1 << width) - 1})', width
+        elif expr_type == 'conc':
+            exprs = [self.gen_expr(expr, refs) for expr in args['exprs']]
+            width = sum(expr_width for _, expr_width in exprs)
+            shift = width
+            terms = []
+
+            for expr, expr_width in exprs:
+                shift -= expr_width
+                terms.append(f'({expr} << {shift})' if shift else expr)
+
+            return f'({" | ".join(terms)})', width
+        elif expr_type in ('and', 'or', 'xor', 'nand', 'nor', 'xnor'):
+            l_expr, width = self.gen_expr(args['l_expr'], refs)
+            r_expr, _ = self.gen_expr(args['r_expr'], refs)
+            expr = f'({l_expr} {OPERATORS[expr_type]} {r_expr})'
+
+            if expr_type in ('nand', 'nor', 'xnor'):
+                expr = f'({expr} ^ {(1 << width) - 1})'
+
+            return expr, width
+        else:
+            assert False, f'Unknown expression type: {expr_type}'
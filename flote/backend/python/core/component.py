@@ -1,6 +1,12 @@
 from collections import deque
+from typing import Iterable, Optional
 
-from .buses import BaseBus
+from .buses import BaseBus, BitBus, BitBusValue, BusValue, OscillationError, SimulationError
+from .memo import MEMO_SIZE, Memo
+from .port import Port
+
+# The default number of times each bus of a feedback loop can be evaluated in one stabilization.
+MAX_ITERATIONS = 100
 
 
 class Component():
@@ -8,6 +14,22 @@ class Component():
     def __init__(self, id_: str) -> None:
         self.id_: str = id_
         self.buses: dict[str, BaseBus] = {}
+        # HLS buses with assignment. Their values come from Python code that is not part of the
+        # influence graph, so they are evaluated on every stabilization.
+        self.hls_buses: list[BaseBus] = []
+        # How the buses are scheduled while stabilizing: 'static' evaluates them once in rank
+        # order and iterates only the feedback loops, 'event' uses rank ordered event queues.
+        self.scheduling: str = 'event'
+        self.depth: int = 0  # The number of ranks of the influence graph.
+        # The buses of each feedback loop (strongly connected component) of the influence graph.
+        self.cycles: list[list[BaseBus]] = []
+        self.max_iterations: int = MAX_ITERATIONS
+        # The stable values of the assigned buses for each value of the inputs, when enabled.
+        self.memo: Optional[Memo[tuple[BusValue, ...]]] = None
+        self.memo_inputs: list[BaseBus] = []
+        self.memo_buses: list[BaseBus] = []
+        # If a port changed the component, without the test bench recording it.
+        self.dirty = False
 
     def __repr__(self):
         repr = ''
@@ -25,30 +47,352 @@ class Component():
             bit_name: str(bit.value) for bit_name, bit in self.buses.items()
         }
 
-    def stabilize(self):
+    def take_dirty(self) -> bool:
+        """This method returns if a port changed the component since the last call, clearing it."""
+        dirty = self.dirty
+        self.dirty = False
+
+        return dirty
+
+    def get_inputs(self) -> list[str]:
+        """This method returns the ids of the bit buses without assignment (the inputs)."""
+        return [
+            id for id, bus in self.buses.items()
+            if isinstance(bus, BitBus) and bus.assignment is None
+        ]
+
+    def enable_memo(self, max_size: int = MEMO_SIZE) -> None:
+        """
+        This method enables the memoization of the stabilization.
+
+        The values of the assigned buses of a combinational component depend only on the inputs,
+        so they are cached for each value of the inputs, and restored instead of stabilizing the
+        component when the same inputs come again. The least recently used entries are evicted
+        when the cache is full.
+        """
+        if self.scheduling != 'static' or self.cycles:
+            raise SimulationError(
+                'Memoization requires a combinational component, without feedback loops or HLS '
+                'components.'
+            )
+
+        self.memo = Memo(max_size)
+        self.memo_inputs = [self.buses[id] for id in self.get_inputs()]
+        self.memo_buses = [bus for bus in self.buses.values() if bus.assignment is not None]
+
+    def disable_memo(self) -> None:
+        """This method disables the memoization and drops the cache."""
+        self.memo = None
+        self.memo_inputs = []
+        self.memo_buses = []
+
+    def memo_stats(self) -> dict[str, int]:
+        """This method returns the statistics of the memoization cache."""
+        if self.memo is None:
+            raise SimulationError('Memoization is not enabled.')
+
+        return self.memo.stats()
+
+    def settle(self) -> None:
+        """
+        This method stabilizes all the buses of the component.
+
+        It is used once, when the component is elaborated, to make the initial values of the
+        buses consistent with their assignments.
+        """
+        self.stabilize(self.buses.values())
+
+    def stabilize(self, seed: Iterable[BaseBus]) -> list[BaseBus]:
         """
         This method stabilizes the bits of the component.
 
-        It is wanted new values (an input stimulus) to the component.
+        Only the buses in the seed (usually the ones influenced by a new stimulus) and the ones
+        they influence while changing are evaluated.
+
+        Returns:
+            list: The buses whose values changed.
+        """
+        # The value of each evaluated bus that changed before the stabilization. A bus of a
+        # feedback loop can go back to its previous value, so they are compared in the end.
+        changed: dict[BaseBus, BusValue] = {}
+
+        if self.scheduling == 'static':
+            self.run_schedule(seed, changed)
+        else:
+            self.run_events(seed, changed)
+
+        return [bus for bus, p_value in changed.items() if p_value != bus.value]
+
+    def run_schedule(self, seed: Iterable[BaseBus], changed: dict[BaseBus, BusValue]) -> None:
+        """
+        Stabilize a component with a static schedule.
+
+        The dirty buses are evaluated in rank order, so every input of a bus is already stable
+        when it is evaluated and no bus is evaluated more than once. Only the feedback loops are
+        iterated, until they reach a fixed point.
+        """
+        levels: list[list[BaseBus]] = [[] for _ in range(self.depth)]
+        dirty: set[BaseBus] = set()
+        solved_cycles: set[int] = set()
+
+        for bus in seed:
+            if bus not in dirty:
+                levels[bus.rank].append(bus)
+                dirty.add(bus)
+
+        for level in levels:
+            for bus in level:
+                if bus.scc is not None:
+                    if bus.scc not in solved_cycles:
+                        solved_cycles.add(bus.scc)
+                        self.solve_cycle(bus.scc, levels, dirty, changed)
+
+                    continue
+
+                p_value = bus.value
+                bus.assign()
+
+                if p_value != bus.value:
+                    changed[bus] = p_value
+
+                    for bus_influenced in bus.influence_list:
+                        if bus_influenced not in dirty:
+                            levels[bus_influenced.rank].append(bus_influenced)
+                            dirty.add(bus_influenced)
+
+    def solve_cycle(
+        self,
+        scc: int,
+        levels: list[list[BaseBus]],
+        dirty: set[BaseBus],
+        changed: dict[BaseBus, BusValue],
+    ) -> None:
+        """
+        Iterate a feedback loop of the static schedule until it reaches a fixed point.
+
+        All the dirty buses of the loop are in the same rank, so they are known when the first of
+        them is reached. The buses out of the loop that change are scheduled in their ranks.
         """
-        queue = deque(self.buses.values())
+        cycle = self.cycles[scc]
+        queue = deque([bus for bus in cycle if bus in dirty])
+        queued = set(queue)
+        budget = self.max_iterations * len(cycle)
 
         while queue:
+            if budget == 0:
+                raise OscillationError([bus.id for bus in cycle], self.max_iterations)
+
+            budget -= 1
             bus = queue.popleft()
+            queued.remove(bus)
+
+            p_value = bus.value
+            bus.assign()
+
+            if p_value != bus.value:
+                changed.setdefault(bus, p_value)
+
+                for bus_influenced in bus.influence_list:
+                    if bus_influenced.scc == scc:
+                        if bus_influenced not in queued:
+                            queue.append(bus_influenced)
+                            queued.add(bus_influenced)
+                    elif bus_influenced not in dirty:
+                        levels[bus_influenced.rank].append(bus_influenced)
+                        dirty.add(bus_influenced)
+
+    def run_events(self, seed: Iterable[BaseBus], changed: dict[BaseBus, BusValue]) -> None:
+        """
+        Stabilize a component with event queues ordered by rank.
+
+        There is a queue for each rank and the lowest rank with pending buses is always served
+        first, so a bus is only evaluated when its inputs in the current wave have settled. It is
+        used when the ranks of the buses can't be trusted, like with HLS buses, so a bus that
+        influences a lower rank makes the wave go back to it.
+        """
+        levels: list[deque[BaseBus]] = [deque() for _ in range(self.depth)]
+        queued: set[BaseBus] = set()
+
+        for bus in (*seed, *self.hls_buses):
+            if bus not in queued:
+                levels[bus.rank].append(bus)
+                queued.add(bus)
+
+        budget = self.max_iterations * len(self.buses)
+        rank = 0
+
+        while rank < self.depth:
+            if not levels[rank]:
+                rank += 1
+                continue
+
+            if budget == 0:
+                raise OscillationError(
+                    [bus.id if bus.id is not None else bus.id_ for bus in queued],
+                    self.max_iterations
+                )
+
+            budget -= 1
+            bus = levels[rank].popleft()
+            queued.remove(bus)
 
             p_value = bus.value
             bus.assign()
             a_value = bus.value
 
-            #TODO Verifica se esse condicional escapa todas as vezes ou não.
             # Dynamic programming: Only add the bits that changed
             if p_value != a_value:
+                changed.setdefault(bus, p_value)
+
                 for bus_influenced in bus.influence_list:
-                    if bus_influenced not in queue:
-                        queue.append(bus_influenced)
+                    if bus_influenced not in queued:
+                        levels[bus_influenced.rank].append(bus_influenced)
+                        queued.add(bus_influenced)
+                        rank = min(rank, bus_influenced.rank)
+
+    def run_lanes(self, inputs: dict[str, list[int]], mask: int) -> dict[str, list[int]]:
+        """
+        Evaluate many independent stimuli at once, one in each bit lane of the planes.
+
+        Every bus is evaluated once, in rank order, with the bitwise operators working on all the
+        lanes together. The inputs not given keep their current value in every lane. The values of
+        the buses are not changed.
+
+        Args:
+            inputs (dict): The planes of the inputs, see `lanes.pack_lanes`.
+            mask (int): The plane with all the lanes set.
+
+        Returns:
+            dict: The planes of all the buses.
+        """
+        if self.scheduling != 'static':
+            raise SimulationError('Batch simulation is not supported with HLS components.')
+
+        if self.cycles:
+            raise SimulationError(
+                'Batch simulation requires a design without feedback loops, the buses '
+                f'{[bus.id for cycle in self.cycles for bus in cycle]} depend on themselves.'
+            )
+
+        for id in inputs:
+            if self.buses[id].assignment is not None:
+                raise SimulationError(f'The bus "{id}" is assigned, it can\'t be an input.')
+
+        planes: dict[BaseBus, list[int]] = {}
+
+        for bus in sorted(self.buses.values(), key=lambda bus: bus.rank):
+            if bus.assignment is not None:
+                planes[bus] = bus.assignment.evaluate_lanes(planes, mask)
+            elif bus.id in inputs:
+                planes[bus] = inputs[bus.id]
+            else:
+                planes[bus] = [mask if bit else 0 for bit in bus.value.raw_value]
+
+        return {id: planes[bus] for id, bus in self.buses.items()}
+
+    def port(self, id: str) -> Port:
+        """This method returns a handle to read and write a bus as an int."""
+        bus = self.buses[id]
+
+        if not isinstance(bus, BitBus):
+            raise SimulationError(f'The bus "{id}" is not a bit bus, it can\'t have a port.')
+
+        return Port(self, bus)
+
+    def check_writable(self, bus: BaseBus) -> None:
+        """This method checks if a bus can be written by the test bench."""
+        if self.memo is not None and bus.assignment is not None:
+            raise SimulationError(
+                f'The bus "{bus.id}" is assigned, only inputs can be updated with memoization.'
+            )
+
+    def propagate(self, seed: list[BaseBus]) -> list[BaseBus]:
+        """
+        This method stabilizes the component after some buses were written.
+
+        The seed has the buses influenced by the written ones that changed. When memoization is
+        enabled the stable values are restored from the cache if the inputs were seen before.
+
+        Returns:
+            list: The buses whose values changed while stabilizing.
+        """
+        if self.memo is None or not seed:
+            return self.stabilize(seed)
+
+        key = tuple([bus.value for bus in self.memo_inputs])
+        values = self.memo.get(key)
+
+        if values is None:
+            changed = self.stabilize(seed)
+            self.memo.put(key, tuple([bus.value for bus in self.memo_buses]))
+
+            return changed
+
+        changed = []
+
+        for bus, value in zip(self.memo_buses, values):
+            if bus.value != value:
+                bus.value = value
+                changed.append(bus)
+
+        return changed
+
+    def update_signals(self, new_values: dict[str, str]) -> list[str]:
+        """
+        This method writes new values to the buses and stabilizes the component.
+
+        Returns:
+            list: The ids of the buses whose values changed, written or stabilized.
+        """
+        seed: list[BaseBus] = []
+        written: list[str] = []
 
-    def update_signals(self, new_values: dict[str, str]) -> None:
         for id, new_value in new_values.items():
-            self.buses[id].insert_value(new_value)
+            bus = self.buses[id]
+            self.check_writable(bus)
+
+            p_value = bus.value
+            bus.insert_value(new_value)
+
+            if p_value != bus.value:
+                seed += bus.influence_list
+                written.append(id)
+
+        changed = [bus.id if bus.id is not None else bus.id_ for bus in self.propagate(seed)]
+
+        return written + [id for id in changed if id not in written]
+
+    def update_ints(self, new_values: dict[str, int]) -> list[str]:
+        """
+        This method writes ints to bit buses and stabilizes the component, like `update_signals`.
+
+        The first bit of a bus is the most significant one of its value.
+
+        Returns:
+            list: The ids of the buses whose values changed, written or stabilized.
+        """
+        seed: list[BaseBus] = []
+        written: list[str] = []
+
+        for id, value in new_values.items():
+            bus = self.buses[id]
+
+            if not isinstance(bus, BitBus):
+                raise SimulationError(f'The bus "{id}" is not a bit bus, it can\'t get an int.')
+
+            self.check_writable(bus)
+            width = bus.value.width
+
+            if value < 0 or value >> width:
+                raise SimulationError(
+                    f'Invalid value "{value}" for "{id}". The value must have {width} bits.'
+                )
+
+            if value != bus.value.bits:
+                bus.value = BitBusValue.from_int(value, width)
+                seed += bus.influence_list
+                written.append(id)
+
+        changed = [bus.id if bus.id is not None else bus.id_ for bus in self.propagate(seed)]
 
-        self.stabilize()
+        return written + [id for id in changed if id not in written]
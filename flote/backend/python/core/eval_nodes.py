@@ -1,3 +1,5 @@
+from typing import Callable
+
 from .buses import BitBusValue, BusValue, BaseBus, Evaluator
 
 
@@ -14,6 +16,9 @@ class Ref(Evaluator):
     def evaluate(self) -> BusValue:
         return self.bus.value[self.range_begin:self.range_end + 1]
 
+    def evaluate_lanes(self, planes: dict[BaseBus, list[int]], mask: int) -> list[int]:
+        return planes[self.bus][self.range_begin:self.range_end + 1]
+
 
 class Conc(Evaluator):
     """This class represents a concatenation of expressions."""
@@ -25,12 +30,18 @@ class Conc(Evaluator):
 
     def evaluate(self) -> BusValue:
         #TODO Trate types
-        result = BitBusValue([])
+        bits = 0
+        width = 0
 
         for expr in self.exprs:
-            result += expr.evaluate()
+            value = expr.evaluate()
+            bits = (bits << value.width) | value.bits
+            width += value.width
+
+        return BitBusValue.from_int(bits, width)
 
-        return result
+    def evaluate_lanes(self, planes: dict[BaseBus, list[int]], mask: int) -> list[int]:
+        return [plane for expr in self.exprs for plane in expr.evaluate_lanes(planes, mask)]
 
 
 class Const(Evaluator):
@@ -43,6 +54,26 @@ class Const(Evaluator):
     def evaluate(self) -> BusValue:
         return self.value
 
+    def evaluate_lanes(self, planes: dict[BaseBus, list[int]], mask: int) -> list[int]:
+        return [mask if bit else 0 for bit in self.value.raw_value]
+
+
+class Compiled(Evaluator):
+    """This class represents an expression compiled to a Python function."""
+    def __init__(self, func: Callable[[], BusValue], source: str, expr: Evaluator) -> None:
+        self.func = func
+        self.source = source
+        self.expr = expr  # The interpreted expression that was compiled
+
+    def __repr__(self) -> str:
+        return f'Compiled({self.expr})'
+
+    def evaluate(self) -> BusValue:
+        return self.func()
+
+    def evaluate_lanes(self, planes: dict[BaseBus, list[int]], mask: int) -> list[int]:
+        return self.expr.evaluate_lanes(planes, mask)
+
 
 class UnaryOperation(Evaluator):
     def __init__(self, expr: Evaluator) -> None:
@@ -74,6 +105,9 @@ class Not(UnaryOperation):
     def evaluate(self):
         return ~ self.expr.evaluate()
 
+    def evaluate_lanes(self, planes, mask):
+        return [plane ^ mask for plane in self.expr.evaluate_lanes(planes, mask)]
+
 
 class And(BinaryOperation):
     def __repr__(self) -> str:
@@ -82,6 +116,12 @@ class And(BinaryOperation):
     def evaluate(self):
         return self.l_expr.evaluate() & self.r_expr.evaluate()
 
+    def evaluate_lanes(self, planes, mask):
+        l_planes = self.l_expr.evaluate_lanes(planes, mask)
+        r_planes = self.r_expr.evaluate_lanes(planes, mask)
+
+        return [left & right for left, right in zip(l_planes, r_planes)]
+
 
 class Or(BinaryOperation):
     def __repr__(self) -> str:
@@ -90,6 +130,12 @@ class Or(BinaryOperation):
     def evaluate(self):
         return self.l_expr.evaluate() | self.r_expr.evaluate()
 
+    def evaluate_lanes(self, planes, mask):
+        l_planes = self.l_expr.evaluate_lanes(planes, mask)
+        r_planes = self.r_expr.evaluate_lanes(planes, mask)
+
+        return [left | right for left, right in zip(l_planes, r_planes)]
+
 
 class Xor(BinaryOperation):
     def __repr__(self) -> str:
@@ -98,6 +144,12 @@ class Xor(BinaryOperation):
     def evaluate(self):
         return self.l_expr.evaluate() ^ self.r_expr.evaluate()
 
+    def evaluate_lanes(self, planes, mask):
+        l_planes = self.l_expr.evaluate_lanes(planes, mask)
+        r_planes = self.r_expr.evaluate_lanes(planes, mask)
+
+        return [left ^ right for left, right in zip(l_planes, r_planes)]
+
 
 class Nand(BinaryOperation):
     def __repr__(self) -> str:
@@ -106,6 +158,12 @@ class Nand(BinaryOperation):
     def evaluate(self):
         return ~ (self.l_expr.evaluate() & self.r_expr.evaluate())
 
+    def evaluate_lanes(self, planes, mask):
+        l_planes = self.l_expr.evaluate_lanes(planes, mask)
+        r_planes = self.r_expr.evaluate_lanes(planes, mask)
+
+        return [(left & right) ^ mask for left, right in zip(l_planes, r_planes)]
+
 
 class Nor(BinaryOperation):
     def __repr__(self) -> str:
@@ -114,6 +172,12 @@ class Nor(BinaryOperation):
     def evaluate(self):
         return ~ (self.l_expr.evaluate() | self.r_expr.evaluate())
 
+    def evaluate_lanes(self, planes, mask):
+        l_planes = self.l_expr.evaluate_lanes(planes, mask)
+        r_planes = self.r_expr.evaluate_lanes(planes, mask)
+
+        return [(left | right) ^ mask for left, right in zip(l_planes, r_planes)]
+
 
 class Xnor(BinaryOperation):
     def __repr__(self) -> str:
@@ -122,5 +186,11 @@ class Xnor(BinaryOperation):
     def evaluate(self):
         return ~ (self.l_expr.evaluate() ^ self.r_expr.evaluate())
 
+    def evaluate_lanes(self, planes, mask):
+        l_planes = self.l_expr.evaluate_lanes(planes, mask)
+        r_planes = self.r_expr.evaluate_lanes(planes, mask)
+
+        return [(left ^ right) ^ mask for left, right in zip(l_planes, r_planes)]
+
 
 Operations = And | Or | Xor | Nand | Nor | Xnor | Not
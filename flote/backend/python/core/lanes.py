@@ -0,0 +1,108 @@
+"""
+This module packs many values of a bus in bit lanes, so independent stimuli can be simulated at
+once with the bitwise operators of Python ints.
+
+A bus of width `w` with `n` values is packed in `w` planes. Plane `i` holds the bit `i` of the bus
+(the first bit is the most significant one, like in `BitBusValue`) of every value, with the value
+`k` in the bit `k` of the plane.
+"""
+from typing import Any, Sequence
+
+from .buses import SimulationError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Translate between strings of bytes 0 and 1 and binary strings.
+BITS = bytes.maketrans(b'\x00\x01', b'01')
+UNBITS = bytes.maketrans(b'01', b'\x00\x01')
+# NumPy arrays are unpacked with integer arithmetic up to this width, wider buses need Python ints.
+NUMPY_WIDTH = 64
+
+
+def is_array(values: Any) -> bool:
+    """Check if the values are a NumPy array."""
+    return np is not None and isinstance(values, np.ndarray)
+
+
+def check_values(bus_id: str, values: Sequence[int], width: int) -> None:
+    """Check that the values fit in a bus, raising a `SimulationError` if they don't."""
+    if len(values) == 0:
+        return
+
+    low = int(min(values))
+    high = int(max(values))
+
+    if low < 0 or high >> width:
+        raise SimulationError(
+            f'Invalid value "{low if low < 0 else high}" for "{bus_id}". The values must have '
+            f'{width} bits.'
+        )
+
+
+def pack_lanes(values: Sequence[int], width: int) -> list[int]:
+    """Pack the values of a bus in planes, one value in each bit lane."""
+    if is_array(values) and values.dtype.kind in 'uib' and width <= NUMPY_WIDTH:
+        lanes = values.astype(np.uint64)
+        planes = []
+
+        for shift in range(width - 1, -1, -1):
+            bits = ((lanes >> np.uint64(shift)) & np.uint64(1)).astype(np.uint8)
+            packed = np.packbits(bits, bitorder='little')
+            planes.append(int.from_bytes(packed.tobytes(), 'little'))
+
+        return planes
+
+    values = list(values)[::-1]  # The first value goes to the lowest lane
+
+    if width == 1:
+        return [int(bytes(values).translate(BITS), 2) if values else 0]
+
+    # The bits of the values are joined in a single string, each plane is a stride of it.
+    joined = ''.join([format(value, f'0{width}b') for value in values])
+
+    return [int(joined[i::width] or '0', 2) for i in range(width)]
+
+
+def unpack_lanes(planes: list[int], count: int, as_array: bool = False) -> Any:
+    """Unpack the planes of a bus in `count` values.
+
+    The values are returned as a NumPy array when `as_array` is set, or as a list of ints.
+    """
+    width = len(planes)
+
+    if as_array and np is not None and width <= NUMPY_WIDTH:
+        values = np.zeros(count, dtype=np.uint64)
+        n_bytes = (count + 7) // 8
+
+        for shift, plane in zip(range(width - 1, -1, -1), planes):
+            packed = np.frombuffer(plane.to_bytes(n_bytes, 'little'), dtype=np.uint8)
+            bits = np.unpackbits(packed, count=count, bitorder='little')
+            values |= bits.astype(np.uint64) << np.uint64(shift)
+
+        return values
+
+    if count == 0:
+        values = []
+    elif width == 1:
+        values = list(format(planes[0], f'0{count}b').encode()[::-1].translate(UNBITS))
+    else:
+        # The planes are joined in a single string, with the lanes of each plane reversed, so the
+        # bits of each value are a stride of it.
+        joined = ''.join([format(plane, f'0{count}b')[::-1] for plane in planes])
+        values = [int(joined[i::count], 2) for i in range(count)]
+
+    if as_array:
+        return to_array(values, width)
+
+    return values
+
+
+def to_array(values: Sequence[int], width: int) -> Any:
+    """Convert the values of a bus to a NumPy array, of Python ints if they don't fit in 64 bits."""
+    if np is None:
+        raise ImportError('NumPy is required to return arrays.')
+
+    return np.array(values, dtype=np.uint64 if width <= NUMPY_WIDTH else object)
@@ -0,0 +1,61 @@
+"""
+This module has the cache used to memoize the stabilization of combinational components.
+"""
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+# The default number of entries of the cache.
+MEMO_SIZE = 4096
+
+T = TypeVar('T')
+
+
+class Memo(Generic[T]):
+    """A least recently used (LRU) cache with hit and miss statistics."""
+    def __init__(self, max_size: int = MEMO_SIZE) -> None:
+        if max_size < 1:
+            raise ValueError(f'The size of the cache must be positive, got {max_size}.')
+
+        self.max_size = max_size
+        self.entries: OrderedDict[Hashable, T] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """Get the entry of a key, marking it as the most recently used, or None on a miss."""
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+        return entry
+
+    def put(self, key: Hashable, entry: T) -> None:
+        """Store the entry of a key, evicting the least recently used one if the cache is full."""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all the entries, keeping the statistics."""
+        self.entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Get the statistics of the cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'max_size': self.max_size,
+        }
@@ -0,0 +1,64 @@
+"""
+This module has the handles used to read and write the buses of a component as ints, without
+parsing strings.
+"""
+from typing import TYPE_CHECKING
+
+from .buses import BitBus, BitBusValue, SimulationError
+
+if TYPE_CHECKING:
+    from .component import Component
+
+
+class Port:
+    """This class is a handle to a bit bus of a component.
+
+    The value of the bus is an int, with the first bit of the bus as the most significant one.
+    Writing a port stabilizes the component, like `Component.update_signals`, but no samples are
+    recorded by the test bench. The component is marked as dirty, so the next update of the test
+    bench records the values of all the buses.
+    """
+    def __init__(self, component: 'Component', bus: BitBus) -> None:
+        self.component = component
+        self.bus = bus
+        self.id = bus.id
+        self.width: int = bus.value.width
+        self.n_bytes = (self.width + 7) // 8
+
+    def __repr__(self) -> str:
+        return f'Port {self.id}: {self.bus.get_vcd_repr()}'
+
+    def write(self, value: int) -> None:
+        """Write an int to the bus and stabilize the component."""
+        bus = self.bus
+
+        if value == bus.value.bits:
+            return
+
+        if value < 0 or value >> self.width:
+            raise SimulationError(
+                f'Invalid value "{value}" for "{self.id}". The value must have {self.width} bits.'
+            )
+
+        self.component.check_writable(bus)
+        bus.value = BitBusValue.from_int(value, self.width)
+        self.component.dirty = True
+        self.component.propagate(bus.influence_list)
+
+    def read(self) -> int:
+        """Read the bus as an int."""
+        return self.bus.value.bits
+
+    def write_bytes(self, data: bytes) -> None:
+        """Write big endian bytes to the bus, the value must fit in its width."""
+        if len(data) != self.n_bytes:
+            raise SimulationError(
+                f'Invalid value "{data!r}" for "{self.id}". The value must have {self.n_bytes} '
+                'bytes.'
+            )
+
+        self.write(int.from_bytes(data, 'big'))
+
+    def read_bytes(self) -> bytes:
+        """Read the bus as big endian bytes."""
+        return self.read().to_bytes(self.n_bytes, 'big')
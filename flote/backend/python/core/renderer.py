@@ -2,14 +2,18 @@ from json import loads
 
 from . import eval_nodes
 from .buses import BaseBus, BitBus, BitBusValue, HlsBus
+from .compiler import Compiler
 from .component import Component
 
 
 class Renderer:
-    def __init__(self, ir: str, hls_buses: dict[str, HlsBus] = {}) -> None:
+    def __init__(self, ir: str, hls_buses: dict[str, HlsBus] = {}, compiled: bool = False) -> None:
         self.ir = ir
         self.buffer_bus_dict: dict[str, BaseBus] = {}
         self.hls_buses = hls_buses
+        # If the assignments are compiled to Python functions instead of interpreted.
+        self.compiled = compiled
+        self.compiler = Compiler(self.buffer_bus_dict)
         self.component = self.render()
 
     def render_expr(self, j_expr) -> eval_nodes.Evaluator | None:
@@ -120,6 +124,8 @@ class Renderer:
                 case _:
                     assert False, 'Invalid IR.'
 
+            bus.rank = j_bus['rank']
+            bus.scc = j_bus['scc']
             self.buffer_bus_dict[j_bus['id']] = bus
 
         for j_bus in j_busses:
@@ -137,6 +143,10 @@ class Renderer:
 
                 assert assignment is not None, f"Failed to render assignment for bus {j_bus['id']}"
 
+                if self.compiled:
+                    func, source = self.compiler.compile_assignment(j_bus['id'], j_bus['assignment'])
+                    assignment = eval_nodes.Compiled(func, source, assignment)
+
                 bit_bus.assignment = assignment
 
             for influenced_bus_id in j_bus['influence_list']:
@@ -146,5 +156,23 @@ class Renderer:
                     bit_bus.influence_list.append(influenced_bus)
 
         component.buses = self.buffer_bus_dict
+        component.hls_buses = [
+            bus for bus in self.hls_buses.values() if bus.assignment is not None
+        ]
+
+        for bus in component.buses.values():
+            if bus.scc is not None:
+                while len(component.cycles) <= bus.scc:
+                    component.cycles.append([])
+
+                component.cycles[bus.scc].append(bus)
+
+        component.depth = max((bus.rank for bus in component.buses.values()), default=-1) + 1
+
+        # HLS buses have influences that are not in the IR, so their ranks can't be trusted.
+        if not self.hls_buses:
+            component.scheduling = 'static'
+
+        component.settle()
 
         return component
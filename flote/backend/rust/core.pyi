@@ -4,7 +4,7 @@ Type stubs for flote.backend.rust.core module.
 This module provides the Rust-based backend for Flote circuit simulation.
 """
 
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 __version__: str
 
@@ -15,15 +15,19 @@ class Component:
     Mantém o Component Rust puro internamente e só passa dados básicos.
     """
 
-    def update_and_get(self, new_values: Dict[str, str]) -> Dict[str, str]:
+    def update_and_get(
+        self, new_values: Dict[str, str], changes_only: bool = False, recorded_only: bool = False
+    ) -> Dict[str, str]:
         """
         Atualiza sinais e retorna valores após estabilização em uma única chamada.
 
         Args:
             new_values: Dicionário com valores a atualizar
+            changes_only: Se verdadeiro, retorna só os buses cujos valores mudaram
+            recorded_only: Se verdadeiro, retorna só os buses gravados (veja `set_recorded`)
 
         Returns:
-            Dicionário com todos os valores após estabilização
+            Dicionário com os valores após estabilização
         """
         ...
 
@@ -45,6 +49,100 @@ class Component:
         """
         ...
 
+    def get_inputs(self) -> List[str]:
+        """
+        Retorna os IDs dos buses sem atribuição (as entradas).
+
+        Returns:
+            Lista com os IDs na ordem de declaração
+        """
+        ...
+
+    def open_stimulus(
+        self,
+        path: str,
+        record: bool = True,
+        changes_only: bool = False,
+        recorded_only: bool = False,
+    ) -> StimulusPlayer:
+        """
+        Abre um arquivo de estímulo para reproduzir no componente, sem voltar ao Python a cada
+        linha.
+
+        Args:
+            path: Caminho do arquivo de estímulo
+            record: Se verdadeiro, o reprodutor retorna as mudanças de cada linha
+            changes_only: Se falso, a primeira linha retorna os valores de todos os buses
+            recorded_only: Se verdadeiro, retorna só os buses gravados (veja `set_recorded`)
+
+        Returns:
+            O reprodutor, que retorna as mudanças em blocos de linhas
+
+        Raises:
+            RuntimeError: Se o arquivo não pode ser aberto ou é inválido
+        """
+        ...
+
+    def set_recorded(self, ids: Optional[List[str]] = None) -> None:
+        """
+        Define os buses gravados pelo test bench, os valores dos outros não são convertidos.
+
+        Args:
+            ids: IDs dos buses gravados, todos quando None
+
+        Raises:
+            RuntimeError: Se algum bus não existe
+        """
+        ...
+
+    def enable_memo(self, max_size: int = 4096) -> None:
+        """
+        Habilita a memoização da estabilização com um cache LRU.
+
+        Args:
+            max_size: Número máximo de entradas do cache
+
+        Raises:
+            RuntimeError: Se o componente tem laços de realimentação
+        """
+        ...
+
+    def disable_memo(self) -> None:
+        """
+        Desabilita a memoização e descarta o cache.
+        """
+        ...
+
+    def memo_stats(self) -> Dict[str, int]:
+        """
+        Retorna as estatísticas do cache de memoização.
+
+        Returns:
+            Dicionário com hits, misses, evictions, size e max_size
+        """
+        ...
+
+    def take_dirty(self) -> bool:
+        """
+        Retorna se um port mudou o componente desde a última chamada, limpando o indicador.
+
+        As escritas dos ports não são gravadas pelo test bench, que grava os valores de todos os
+        buses na próxima atualização quando o componente mudou.
+        """
+        ...
+
+    def port(self, id: str) -> Port:
+        """
+        Retorna um handle para ler e escrever um bus como inteiro.
+
+        Args:
+            id: ID do bus
+
+        Raises:
+            RuntimeError: Se o bus não existe
+        """
+        ...
+
     @property
     def busses(self) -> Dict[str, str]:
         """
@@ -52,6 +150,13 @@ class Component:
         """
         ...
 
+    @property
+    def cyclic(self) -> bool:
+        """
+        Retorna se o grafo de influência tem laços de realimentação.
+        """
+        ...
+
     @property
     def id_(self) -> str:
         """
@@ -63,6 +168,80 @@ class Component:
     def __repr__(self) -> str: ...
 
 
+class Port:
+    """
+    Handle para um bus de um componente, lido e escrito como inteiro sem passar por strings.
+    O primeiro bit do bus é o mais significativo.
+    """
+
+    @property
+    def id(self) -> str: ...
+
+    @property
+    def width(self) -> int: ...
+
+    def write(self, value: int) -> None:
+        """
+        Escreve um inteiro no bus e estabiliza o componente.
+
+        Raises:
+            RuntimeError: Se o valor não cabe no bus ou o bus tem mais de 128 bits
+        """
+        ...
+
+    def read(self) -> int:
+        """
+        Lê o bus como inteiro.
+
+        Raises:
+            RuntimeError: Se o bus tem mais de 128 bits
+        """
+        ...
+
+    def write_bytes(self, data: bytes) -> None:
+        """
+        Escreve bytes big endian no bus e estabiliza o componente.
+        """
+        ...
+
+    def read_bytes(self) -> bytes:
+        """
+        Lê o bus como bytes big endian.
+        """
+        ...
+
+    def __repr__(self) -> str: ...
+
+
+class StimulusPlayer:
+    """Reprodução de um arquivo de estímulo em um componente, em blocos de linhas."""
+
+    @property
+    def n_rows(self) -> int:
+        """Número de linhas reproduzidas."""
+        ...
+
+    @property
+    def total_delay(self) -> int:
+        """Soma das esperas das linhas reproduzidas."""
+        ...
+
+    def play(self, max_rows: int = 1024) -> List[Tuple[int, Dict[str, str]]]:
+        """
+        Reproduz as próximas linhas, ou o arquivo inteiro quando as mudanças não são gravadas.
+
+        Args:
+            max_rows: Número máximo de linhas reproduzidas
+
+        Returns:
+            A espera e as mudanças de cada linha, uma lista vazia no fim do arquivo
+
+        Raises:
+            RuntimeError: Se o arquivo é inválido ou uma entrada não pode ser escrita
+        """
+        ...
+
+
 class Renderer:
     """
     Renderiza IR JSON em componentes executáveis.
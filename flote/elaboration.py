@@ -20,10 +20,12 @@ class ElaborationError(Exception):
         return self.message
 
 
-def render(ast, rust_backend, hls_components: list[HlsComponent] = []):
+def render(ast, rust_backend, hls_components: list[HlsComponent] = [], compiled=False):
     if rust_backend:
         if len(hls_components) > 0:
             warn('HLS components require Python backend, switching from Rust.')
+        elif compiled:
+            warn('Compiled engine requires Python backend, switching from Rust.')
         else:
             try:
                 from .backend.rust.core import Renderer as RustRenderer
@@ -68,11 +70,13 @@ def render(ast, rust_backend, hls_components: list[HlsComponent] = []):
 
     # Render with Python backend
     from .backend.python.core import Renderer as PythonRenderer
-    render = PythonRenderer(ir, hls_components_buses)
+    render = PythonRenderer(ir, hls_components_buses, compiled=compiled)
     return render.component
 
 
-def elaborate(code: str, rust_backend=True, hls_components: list[HlsComponent] = []) -> TestBench:
+def elaborate(
+    code: str, rust_backend=True, hls_components: list[HlsComponent] = [], compiled=False
+) -> TestBench:
     # 1. Lexical analysis and token stream generation
     scanner = Scanner(code)
     tokens_stream = scanner.token_stream
@@ -82,7 +86,9 @@ def elaborate(code: str, rust_backend=True, hls_components: list[HlsComponent] =
     ast = parser.ast
 
     # 3. Semantical analysis and IR generation
-    component = render(ast, rust_backend=rust_backend, hls_components=hls_components)
+    component = render(
+        ast, rust_backend=rust_backend, hls_components=hls_components, compiled=compiled
+    )
 
     # 4. Creating the testbench and encapsulating the component
     assert component is not None, "Elaboration failed: component is None"
@@ -91,10 +97,12 @@ def elaborate(code: str, rust_backend=True, hls_components: list[HlsComponent] =
 
 
 def elaborate_file(
-    file_path, rust_backend=True, hls_components: list[HlsComponent] = []
+    file_path, rust_backend=True, hls_components: list[HlsComponent] = [], compiled=False
 ) -> TestBench:
     p = Path(file_path)
     with p.open('r', encoding='utf-8') as file:
         code = file.read()
 
-    return elaborate(code, rust_backend=rust_backend, hls_components=hls_components)
+    return elaborate(
+        code, rust_backend=rust_backend, hls_components=hls_components, compiled=compiled
+    )
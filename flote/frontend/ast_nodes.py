@@ -47,7 +47,7 @@ class Comp:
     def __init__(self) -> None:
         self.id = ''
         self.is_main = False
-        self.stmts: list[Union[Decl, Assign, Inst]] = []
+        self.stmts: list[Union[Decl, Assign, Inst, Assert]] = []
         self.line_number = 0
 
     def add_stmt(self, stmt):
@@ -281,3 +281,16 @@ class Inst:
 
     def __str__(self) -> str:
         return f'Inst: {self.sub_alias} of {self.comp_id}'
+
+
+class Assert:
+    def __init__(self) -> None:
+        self.expr: Optional[ExprElem] = None
+        self.line_number: int = 0
+
+    def __repr__(self) -> str:
+        return f'Assert({self.expr})'
+
+    def __str__(self) -> str:
+        desc_expr = str(self.expr).replace('\n', '\n|  ')
+        return f'Assert:\n|  |- expr: {desc_expr}'
@@ -9,6 +9,9 @@ from .ir.buses import BitBusDto, BitBusValueDto
 from .ir.component import ComponentDto, HlsComponentDto
 from .symbol_table import BusSymbol, ComponentTable, SymbolTable
 
+# The prefix of the ids of the buses of the assertions, that can't be written in the language.
+ASSERTION_PREFIX = 'assert@'
+
 
 class SemanticalError(Exception):
     def __init__(self, message: str, line_number: Optional[int] = None):
@@ -44,6 +47,7 @@ class Builder:
     def get_ir(self) -> str:
         component = self.vst_mod(self.ast)
         component.make_influence_graph()
+        component.levelize()
 
         return dumps(component.to_json())
 
@@ -170,6 +174,8 @@ class Builder:
                 self.vst_assign(stmt, component_id, component)
             elif isinstance(stmt, ast_nodes.Inst):
                 self.vst_inst(stmt, component_id, component)
+            elif isinstance(stmt, ast_nodes.Assert):
+                self.vst_assert(stmt, component_id, component)
             else:
                 assert False, f'Invalid statement: {stmt}'
 
@@ -269,6 +275,41 @@ class Builder:
         assert bus is not None, f'Bus object for "{assign.destiny.id}" cannot be None.'
         bus.assignment = assignment
 
+    def vst_assert(
+        self, check: ast_nodes.Assert, component_id: str, component: ComponentDto
+    ) -> None:
+        """
+        Visit an assertion, creating an internal bus assigned to its expression.
+
+        The bus is named after the line of the assertion and is updated by the simulation like
+        any other bus, the test bench records a failure when its value is 0.
+        """
+        bus_symbols = self.symbol_table.components[component_id].bus_symbols
+        bus_id = f'{ASSERTION_PREFIX}{check.line_number}'
+        n = 1
+
+        while bus_id in bus_symbols:
+            n += 1
+            bus_id = f'{ASSERTION_PREFIX}{check.line_number}_{n}'
+
+        assignment, size = self.vst_expr(check.expr, component_id, component)
+
+        if size != 1:
+            raise SemanticalError(
+                f'The expression of an assertion must have 1 bit, got {size}.',
+                check.line_number
+            )
+
+        bus_symbol = BusSymbol('bit', True, ast_nodes.Connection.INTERNAL, 1)
+        bus_symbol.is_read = True
+        bit_bus = BitBusDto()
+        bit_bus.id_ = bus_id
+        bit_bus.assignment = assignment
+        bus_symbol.object = bit_bus
+        bus_symbols[bus_id] = bus_symbol
+
+        component.busses.append(bit_bus)
+
     def vst_expr(self, expr, component_id: str, component: ComponentDto) -> Tuple[
         expr_nodes.ExprNode, int
     ]:
@@ -21,6 +21,10 @@ class BaseBusDto(Generic[AssignType, ValueType], JsonRepresentation):
         self.value: ValueType = self.get_default()  # The value of the bus.
         # The list of buses that the current bus depends on.
         self.influence_list: list[BaseBusDto[AssignType, ValueType]] = []
+        # The topological rank of the bus in the influence graph.
+        self.rank: Optional[int] = None
+        # The index of the feedback loop (strongly connected component) of the bus, if any.
+        self.scc: Optional[int] = None
 
     def __str__(self) -> str:
         return (
@@ -90,7 +94,9 @@ class HlsBusDto(BusDto):
         return {
             'id': self.id_,
             'type': 'hls_bus',
-            'influence_list': [bus.id_ for bus in self.influence_list]
+            'influence_list': [bus.id_ for bus in self.influence_list],
+            'rank': self.rank,
+            'scc': self.scc
         }
 
 
@@ -130,5 +136,7 @@ class BitBusDto(BusDto):
             'type': self.type,
             'value': self.value.to_json(),
             'assignment': assignment_json,
-            'influence_list': [bus.id_ for bus in self.influence_list]
+            'influence_list': [bus.id_ for bus in self.influence_list],
+            'rank': self.rank,
+            'scc': self.scc
         }
@@ -37,6 +37,93 @@ class ComponentDto(BaseComponentDto[BusDto | HlsBusDto]):
         for bus in self.busses:
             bus.make_influence_list()
 
+    def get_strongly_connected_components(self) -> list[list[BusDto | HlsBusDto]]:
+        """
+        Get the strongly connected components of the influence graph in topological order.
+
+        It uses an iterative version of Tarjan's algorithm, so long chains of buses don't reach
+        the recursion limit.
+        """
+        indexes: dict[BusDto | HlsBusDto, int] = {}
+        low_links: dict[BusDto | HlsBusDto, int] = {}
+        stack: list[BusDto | HlsBusDto] = []
+        on_stack: set[BusDto | HlsBusDto] = set()
+        components: list[list[BusDto | HlsBusDto]] = []
+        work: list = []  # The buses being visited and the iterators over their influence lists
+
+        def visit(bus):
+            indexes[bus] = low_links[bus] = len(indexes)
+            stack.append(bus)
+            on_stack.add(bus)
+            work.append((bus, iter(bus.influence_list)))
+
+        for root in self.busses:
+            if root in indexes:
+                continue
+
+            visit(root)
+
+            while work:
+                bus, influenced_buses = work[-1]
+
+                for influenced_bus in influenced_buses:
+                    if influenced_bus not in indexes:
+                        visit(influenced_bus)
+                        break
+                    elif influenced_bus in on_stack:
+                        low_links[bus] = min(low_links[bus], indexes[influenced_bus])
+                else:
+                    work.pop()
+
+                    if work:
+                        parent = work[-1][0]
+                        low_links[parent] = min(low_links[parent], low_links[bus])
+
+                    if low_links[bus] == indexes[bus]:
+                        component = []
+
+                        while True:
+                            member = stack.pop()
+                            on_stack.remove(member)
+                            component.append(member)
+
+                            if member is bus:
+                                break
+
+                        components.append(component)
+
+        # Tarjan's algorithm finds the components in reverse topological order.
+        return components[::-1]
+
+    def levelize(self) -> None:
+        """
+        Rank the buses in topological order of the influence graph.
+
+        The buses of a strongly connected component (a feedback loop) share the same rank, that is
+        the length of the longest path that reaches the component in the condensed graph. The
+        buses that are part of a feedback loop also receive the index of their loop.
+        """
+        ranks = {bus: 0 for bus in self.busses}
+        ranked: set[BusDto | HlsBusDto] = set()
+        cycles_count = 0
+
+        for component in self.get_strongly_connected_components():
+            rank = max(ranks[bus] for bus in component)
+            is_cycle = len(component) > 1 or component[0] in component[0].influence_list
+
+            for bus in component:
+                bus.rank = rank
+                bus.scc = cycles_count if is_cycle else None
+                ranked.add(bus)
+
+            for bus in component:
+                for influenced_bus in bus.influence_list:
+                    if influenced_bus not in ranked:
+                        ranks[influenced_bus] = max(ranks[influenced_bus], rank + 1)
+
+            if is_cycle:
+                cycles_count += 1
+
     def to_json(self):
         return {
             'component': {
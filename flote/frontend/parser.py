@@ -5,7 +5,7 @@ from .scanner import Token
 # Dict of First Sets used to enter syntactical rules
 FIRST_SETS = {
     'comp': ['main', 'comp'],
-    'stmt': ['in', 'out', 'bit', 'id', 'sub'],
+    'stmt': ['in', 'out', 'bit', 'id', 'sub', 'assert'],
     'decl': ['in', 'out', 'bit'],
     'assign': ['id'],
     'expr_dash': ['or', 'nor'],
@@ -101,7 +101,7 @@ class Parser:
 
         return comp
 
-    #* stmt = decl | assign | inst
+    #* stmt = decl | assign | inst | check
     def stmt(self):
         if (label := self.get_current_token().label) in FIRST_SETS['decl']:
             return self.decl()
@@ -109,6 +109,8 @@ class Parser:
             return self.assign()
         elif label == 'sub':
             return self.inst()
+        elif label == 'assert':
+            return self.check()
         else:
             assert False, f'Unexpected Token: {label}'
 
@@ -451,3 +453,16 @@ class Parser:
         self.advance()
 
         return inst
+
+    #* check = 'assert', expr, ';';
+    def check(self):
+        self.match_label('assert')
+        check = ast_nodes.Assert()
+        check.line_number = self.get_current_token().line_number
+        self.advance()
+
+        check.expr = self.expr()
+        self.match_label('semicolon')
+        self.advance()
+
+        return check
@@ -20,6 +20,7 @@ KEY_WORDS = [
     'or',
     'sub',
     'as',
+    'assert',
 ]
 SYMBOLS_LABELS = {
     ';': 'semicolon',
@@ -0,0 +1,109 @@
+"""
+This module compares the outputs of a simulation against a reference model over many vectors at
+once, with NumPy operations over the arrays of each bus instead of a loop over the vectors.
+"""
+from typing import Any, Callable, Optional
+
+from .backend.python.core.lanes import NUMPY_WIDTH, np
+
+Reference = Callable[[dict[str, Any]], dict[str, Any]]  # The expected outputs for the inputs
+
+
+class Comparison:
+    """This class has the result of the comparison of some outputs against a reference model.
+
+    The vectors are the stimuli of a batch or the recorded times, in order. `indices` has the
+    vectors where any output mismatched and `mismatches` the ones of each output. It is true
+    when all the outputs matched.
+    """
+    def __init__(
+        self,
+        inputs: dict[str, Any],
+        actual: dict[str, Any],
+        expected: dict[str, Any],
+        times: Optional[Any] = None,
+    ) -> None:
+        self.inputs = inputs
+        self.actual = actual
+        self.expected = expected
+        self.times = times  # The time of each vector, when they come from the recorded waves
+        self.mismatches: dict[str, Any] = {
+            id: np.flatnonzero(get_mismatches(actual[id], expected[id])) for id in actual
+        }
+        self.indices = np.unique(np.concatenate(
+            list(self.mismatches.values()) or [np.zeros(0, dtype=np.intp)]
+        ))
+
+    def __bool__(self) -> bool:
+        return len(self.indices) == 0
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __repr__(self) -> str:
+        return f'Comparison: {len(self.indices)} mismatched vectors'
+
+    def report(self, limit: int = 10) -> str:
+        """Get a description of the first `limit` mismatched vectors."""
+        lines = [repr(self)]
+
+        for index in self.indices[:limit]:
+            where = f'#{index}' if self.times is None else f'#{index} (time {self.times[index]})'
+            inputs = ', '.join(f'{id}={values[index]}' for id, values in self.inputs.items())
+            outputs = ', '.join(
+                f'{id}={self.actual[id][index]} (expected {self.expected[id][index]})'
+                for id, indices in self.mismatches.items()
+                if np.any(indices == index)
+            )
+            lines.append(f'{where}: {inputs} -> {outputs}')
+
+        if len(self.indices) > limit:
+            lines.append(f'... {len(self.indices) - limit} more')
+
+        return '\n'.join(lines)
+
+
+def get_mismatches(actual: Any, expected: Any) -> Any:
+    """Get a boolean array with the vectors where the expected values differ from the actual ones.
+
+    The actual values are unsigned, so negative expected values mismatch instead of wrapping.
+    """
+    if expected.dtype.kind in 'iub' and actual.dtype.kind == 'u':
+        mismatches = expected.astype(np.uint64) != actual
+
+        if expected.dtype.kind == 'i':
+            mismatches |= expected < 0
+
+        return mismatches
+
+    return expected != actual
+
+
+def compare(
+    inputs: dict[str, Any],
+    actual: dict[str, Any],
+    expected: dict[str, Any],
+    widths: dict[str, int],
+    times: Optional[Any] = None,
+) -> Comparison:
+    """
+    Compare the actual outputs of the vectors against the ones of a reference model.
+
+    Args:
+        inputs (dict): The values of the inputs of each vector, as NumPy arrays.
+        actual (dict): The values of the outputs of each vector, as NumPy arrays.
+        expected (dict): The values returned by the model for some outputs, as arrays or as
+            scalars for all the vectors.
+        widths (dict): The width of each output.
+        times (array): The time of each vector, if any.
+    """
+    arrays = {}
+
+    for id, values in expected.items():
+        if id not in actual:
+            raise ValueError(f'The reference returned "{id}", that isn\'t a bus of the component.')
+
+        dtype = object if widths[id] > NUMPY_WIDTH else None
+        arrays[id] = np.broadcast_to(np.asarray(values, dtype=dtype), actual[id].shape)
+
+    return Comparison(inputs, {id: actual[id] for id in arrays}, arrays, times)
@@ -0,0 +1,107 @@
+"""
+This module has the monitors, properties of the buses checked while the simulation runs.
+
+A monitor is evaluated when it is added, with the current values of its buses, and then only when
+one of its buses changes. The changes come from the buses the component updated while stabilizing,
+which follow the influence lists of the engine, so checking costs time proportional to the changes
+and not to the number of monitors.
+"""
+from typing import Callable, Iterable, Sequence
+
+
+class Failure:
+    """This class represents a check of a monitor that failed."""
+    def __init__(self, time: int, monitor: str, values: dict[str, int]) -> None:
+        self.time = time
+        self.monitor = monitor
+        # The values of the buses of the monitor when it failed
+        self.values = values
+
+    def __repr__(self) -> str:
+        return f'Failure {self.monitor} at {self.time}: {self.values}'
+
+
+class Monitor:
+    """This class represents a predicate over the int values of some bit buses."""
+    def __init__(self, name: str, buses: Sequence[str], predicate: Callable[..., bool]) -> None:
+        self.name = name
+        self.buses = list(buses)
+        self.predicate = predicate
+
+    def __repr__(self) -> str:
+        return f'Monitor {self.name}: {self.buses}'
+
+
+class Monitors:
+    """This class keeps the monitors of a test bench, indexed by the buses they read.
+
+    The values of the monitored buses are kept as ints and updated from the changes, so the
+    monitors see the values of each update, even when the changes are checked after the
+    component moved on.
+    """
+    def __init__(self) -> None:
+        self.monitors: dict[str, Monitor] = {}
+        self.by_bus: dict[str, list[Monitor]] = {}  # The monitors that read each bus
+        self.values: dict[str, int] = {}  # The last value of each monitored bus
+        self.failures: list[Failure] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.monitors)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.by_bus
+
+    def add(self, monitor: Monitor, time: int, values: dict[str, int]) -> None:
+        """Add a monitor and evaluate it with the current values of its buses."""
+        if monitor.name in self.monitors:
+            raise ValueError(f'The monitor "{monitor.name}" already exists.')
+
+        self.monitors[monitor.name] = monitor
+        self.values |= values
+
+        for id in monitor.buses:
+            self.by_bus.setdefault(id, []).append(monitor)
+
+        self.evaluate(time, monitor)
+
+    def check(self, time: int, changed: Iterable[str], read: Callable[[str], int]) -> None:
+        """
+        Evaluate the monitors of the buses that changed, recording the ones that fail.
+
+        The buses whose value is the one already known are skipped, so the changes can have
+        all the buses, as the samples that resync the recording.
+
+        Args:
+            time (int): The time of the changes.
+            changed (iterable): The ids of the buses that may have changed.
+            read (callable): A function that returns the new value of a monitored bus.
+        """
+        by_bus = self.by_bus
+        values = self.values
+        triggered: dict[str, Monitor] = {}
+
+        for id in changed:
+            monitors = by_bus.get(id)
+
+            if monitors is None:
+                continue
+
+            value = read(id)
+
+            if value == values[id]:
+                continue
+
+            values[id] = value
+
+            for monitor in monitors:
+                triggered[monitor.name] = monitor
+
+        for monitor in triggered.values():
+            self.evaluate(time, monitor)
+
+    def evaluate(self, time: int, monitor: Monitor) -> None:
+        """Evaluate a monitor with the known values of its buses, recording it if it fails."""
+        args = [self.values[id] for id in monitor.buses]
+
+        if not monitor.predicate(*args):
+            self.failures.append(Failure(time, monitor.name, dict(zip(monitor.buses, args))))
@@ -0,0 +1,75 @@
+"""
+This module has the recorder that writes the waves of a simulation on a background thread, so the
+conversion of the values, the compression and the writes to files don't stall the simulation.
+"""
+from queue import Queue
+from threading import Thread
+from typing import Any, Callable, Optional
+
+# The default number of updates waiting to be recorded.
+QUEUE_SIZE = 1024
+
+
+class BackgroundRecorder:
+    """This class runs the recording tasks of a test bench on a thread, in order.
+
+    The tasks wait in a bounded queue. When it is full, submitting a task blocks until the thread
+    catches up, so no changes are dropped and the memory used is bounded. An error of a task
+    stops the recording for good: the next tasks are skipped, the next call from the simulation
+    raises the error and every call after it raises a `RuntimeError` caused by the error, so the
+    changes that can't be recorded anymore aren't dropped silently.
+    """
+    def __init__(self, queue_size: int = QUEUE_SIZE) -> None:
+        if queue_size < 1:
+            raise ValueError(f'The size of the queue must be positive, got {queue_size}.')
+
+        self.queue: Queue[Optional[tuple[Callable, tuple]]] = Queue(maxsize=queue_size)
+        self.error: Optional[BaseException] = None  # The error of the task that failed
+        self.failed = False
+        self.raised = False  # If the error was already raised
+        self.thread = Thread(target=self.run, name='flote-recorder', daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            task = self.queue.get()
+
+            try:
+                if task is None:
+                    return
+
+                if not self.failed:
+                    function, args = task
+                    function(*args)
+            except BaseException as error:
+                self.error = error
+                self.failed = True
+            finally:
+                self.queue.task_done()
+
+    def check(self) -> None:
+        """Raise the error of a task, if any."""
+        if self.error is None:
+            return
+
+        if not self.raised:
+            self.raised = True
+            raise self.error
+
+        raise RuntimeError('The recording stopped after a task failed.') from self.error
+
+    def submit(self, function: Callable, *args: Any) -> None:
+        """Run a function on the thread, after the ones already submitted."""
+        self.check()
+        self.queue.put((function, args))
+
+    def wait(self) -> None:
+        """Wait for all the submitted tasks to run."""
+        self.queue.join()
+        self.check()
+
+    def stop(self) -> None:
+        """Wait for all the submitted tasks and stop the thread."""
+        self.queue.put(None)
+        self.thread.join()
+        self.check()
@@ -0,0 +1,30 @@
+"""
+This module has the base class of the sinks, that receive the value changes recorded by the test
+bench while the simulation runs.
+"""
+from abc import ABC, abstractmethod
+
+
+class WaveSink(ABC):
+    """Base class for all the sinks of the waves of a simulation."""
+    @abstractmethod
+    def open(self, component_id: str, widths: dict[str, int], time_unit: str) -> None:
+        """Start the waves of a component, with the width of each bus."""
+        pass
+
+    @abstractmethod
+    def write(self, time: int, changes: dict[str, str]) -> None:
+        """Write the new values of the buses that changed at a time.
+
+        The times never decrease, and the first changes have the values of all the buses.
+        """
+        pass
+
+    def flush(self) -> None:
+        """Make the waves written so far durable."""
+        pass
+
+    @abstractmethod
+    def close(self, end_time: int) -> None:
+        """Finish the waves at the end time of the simulation."""
+        pass
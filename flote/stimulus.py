@@ -0,0 +1,218 @@
+"""
+This module writes and reads stimulus files, a packed binary format with the values of the inputs
+of a component for many updates, that is played without parsing strings.
+
+The file has a header with the inputs and their bit offsets in the rows, followed by rows of the
+same size. Each row has, when the file has delays, the time waited after the row is applied as an
+8 bytes little endian int, then the bits of the inputs. The first input is at the offset 0, the most
+significant bit of the first byte, and the first bit of an input is its most significant one.
+"""
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Sequence
+
+MAGIC = b'FLST'
+FORMAT_VERSION = 1
+HAS_DELAYS = 1
+
+HEADER = struct.Struct('<4sBBHI')  # Magic, format version, flags, reserved and metadata size
+DELAY = struct.Struct('<Q')
+
+# The rows played by the Rust backend before their changes are returned to Python.
+PLAYBACK_ROWS = 1024
+
+
+class StimulusError(Exception):
+    """This class represents an invalid stimulus file."""
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def get_layout(widths: dict[str, int]) -> tuple[list[tuple[str, int, int]], int]:
+    """Get the id, width and bit offset of each input and the number of bytes of the rows."""
+    inputs = []
+    offset = 0
+
+    for id, width in widths.items():
+        inputs.append((id, width, offset))
+        offset += width
+
+    return inputs, (offset + 7) // 8
+
+
+class StimulusWriter:
+    """This class writes the rows of a stimulus file.
+
+    The inputs not given in a row keep their values of the previous one, starting at 0.
+    """
+    def __init__(
+        self, file: str | Path | BinaryIO, widths: dict[str, int], delays: bool = False
+    ) -> None:
+        if isinstance(file, (str, Path)):
+            self.file: BinaryIO = open(file, 'wb')
+            self.owns_file = True
+        else:
+            self.file = file
+            self.owns_file = False
+
+        self.inputs, self.row_bytes = get_layout(widths)
+        self.delays = delays
+        # The shift of the value of each input in the int of a row
+        self.shifts = {
+            id: self.row_bytes * 8 - offset - width for id, width, offset in self.inputs
+        }
+        self.widths = dict(widths)
+        self.values = {id: 0 for id in widths}
+        self.n_rows = 0
+
+        metadata = json.dumps({
+            'inputs': [list(input) for input in self.inputs],
+            'row_bytes': self.row_bytes,
+        }).encode()
+        # The rows are aligned to 8 bytes, to be read from a memory map
+        metadata += b' ' * (-(HEADER.size + len(metadata)) % 8)
+
+        self.file.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, HAS_DELAYS if delays else 0, 0, len(metadata)
+        ))
+        self.file.write(metadata)
+
+    def __enter__(self) -> 'StimulusWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, values: dict[str, int], delay: int = 0) -> None:
+        """Write a row with the new values of some inputs, waiting `delay` after it."""
+        for id, value in values.items():
+            if id not in self.values:
+                raise StimulusError(f'The bus "{id}" is not an input of the stimulus file.')
+
+            if value < 0 or value >> self.widths[id]:
+                raise StimulusError(
+                    f'Invalid value "{value}" for "{id}". The value must have {self.widths[id]} '
+                    'bits.'
+                )
+
+            self.values[id] = value
+
+        if delay and not self.delays:
+            raise StimulusError('The stimulus file has no delays.')
+
+        row = 0
+
+        for id, value in self.values.items():
+            row |= value << self.shifts[id]
+
+        if self.delays:
+            self.file.write(DELAY.pack(delay))
+
+        self.file.write(row.to_bytes(self.row_bytes, 'big'))
+        self.n_rows += 1
+
+    def close(self) -> None:
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+def write_stimulus(
+    file_path: str | Path,
+    inputs: dict[str, Sequence[int]],
+    widths: dict[str, int],
+    delays: Optional[Sequence[int]] = None,
+) -> None:
+    """
+    Write a stimulus file with the values of each input for each row.
+
+    Args:
+        file_path (str): The path of the file.
+        inputs (dict): The values of each input, as sequences of ints of the same length.
+        widths (dict): The width of each input.
+        delays (list): The time waited after each row, if any.
+    """
+    counts = {len(values) for values in inputs.values()}
+
+    if len(counts) > 1:
+        raise ValueError(f'The inputs must have the same number of values, got {counts}.')
+
+    count = counts.pop() if counts else 0
+
+    with StimulusWriter(file_path, widths, delays is not None) as writer:
+        for i in range(count):
+            writer.write(
+                {id: int(values[i]) for id, values in inputs.items()},
+                0 if delays is None else int(delays[i]),
+            )
+
+
+class StimulusFile:
+    """This class reads a stimulus file through a memory map."""
+    def __init__(self, file_path: str | Path) -> None:
+        with open(file_path, 'rb') as file:
+            magic, version, flags, _, metadata_size = HEADER.unpack(file.read(HEADER.size))
+
+            if magic != MAGIC:
+                raise StimulusError(f'"{file_path}" is not a Flote stimulus file.')
+
+            if version != FORMAT_VERSION:
+                raise StimulusError(f'Unsupported stimulus file version {version}.')
+
+            metadata = json.loads(file.read(metadata_size))
+            size = file.seek(0, 2)
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.inputs: list[tuple[str, int, int]] = [tuple(input) for input in metadata['inputs']]
+        self.widths = {id: width for id, width, _ in self.inputs}
+        self.row_bytes: int = metadata['row_bytes']
+        self.delays = bool(flags & HAS_DELAYS)
+        self.row_size = self.row_bytes + (DELAY.size if self.delays else 0)
+        self.data_offset = HEADER.size + metadata_size
+        self.n_rows = (size - self.data_offset) // self.row_size if self.row_size else 0
+
+        for id, width, offset in self.inputs:
+            if offset + width > self.row_bytes * 8:
+                self.map.close()
+                raise StimulusError(f'The input "{id}" is outside the rows of the stimulus file.')
+
+    def __enter__(self) -> 'StimulusFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def close(self) -> None:
+        self.map.close()
+
+    def __iter__(self) -> Iterator[tuple[int, dict[str, int]]]:
+        """Iterate over the rows, as the delay after the row and the values of the inputs."""
+        data = self.map
+        row_bytes = self.row_bytes
+        has_delays = self.delays
+        # The shift and mask of each input in the int of a row
+        fields = [
+            (id, row_bytes * 8 - offset - width, (1 << width) - 1)
+            for id, width, offset in self.inputs
+        ]
+        position = self.data_offset
+        delay = 0
+
+        for _ in range(self.n_rows):
+            if has_delays:
+                delay = DELAY.unpack_from(data, position)[0]
+                position += DELAY.size
+
+            row = int.from_bytes(data[position:position + row_bytes], 'big')
+            position += row_bytes
+
+            yield delay, {id: (row >> shift) & mask for id, shift, mask in fields}
@@ -2,13 +2,27 @@
 This module have classes responsible for registering the signals values and
 controlling time in them simulation.
 """
-from datetime import datetime
+from fnmatch import fnmatchcase
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
 
+from .backend.python.core.buses import BitBus, SimulationError
 from .backend.python.core.component import Component as PythonComponent
+from .backend.python.core.lanes import (
+    check_values, is_array, np, pack_lanes, to_array, unpack_lanes
+)
 from .backend.rust.core import Component as RustComponent
+from .frontend.builder import ASSERTION_PREFIX
+from .golden import Comparison, Reference, compare
+from .monitors import Failure, Monitor, Monitors
+from .recorder import QUEUE_SIZE, BackgroundRecorder
+from .sink import WaveSink
+from .stimulus import PLAYBACK_ROWS, StimulusFile
+from .vcd import BUFFER_SIZE, VcdReader, VcdWriter
+from .wavefile import BLOCK_SIZE, WaveFileWriter
+from .waves import CHUNK_SIZE, WaveStore
 
-VERSION = '0.4.0'
-CODENAME = 'Gambiarra'
 VALID_UNITS = ['fs', 'ps', 'ns', 'us', 'ms', 's']
 
 
@@ -39,8 +53,29 @@ class TestBench:
     def __init__(self, component: PythonComponent | RustComponent) -> None:
         self.s_time: int = 0
         self.time_unit: str = 'ns'
-        self.samples: list[WaveSample] = []
+        # The value changes recorded in memory, with the times and values of each bus in arrays.
+        # It is written by the background recording, so it is read through `waves`.
+        self.wave_store = WaveStore()
         self.component = component
+        # The sinks that receive the value changes while the simulation runs.
+        self.sinks: list[WaveSink] = []
+        # If the samples are kept in memory, it can be disabled when the changes go to sinks.
+        self.keep_samples = True
+        # The setting of `keep_samples` before the sinks changed it, restored when they are closed.
+        self.saved_keep_samples: Optional[bool] = None
+        self.started = False  # If the first sample, with all the buses, was recorded.
+        # If the component changed without being recorded, so the next sample has all the buses.
+        self.resync = False
+        # The width of each recorded bus, all of them are recorded when None.
+        self.recorded: Optional[dict[str, int]] = None
+        # The thread that records the changes, when they aren't recorded by the simulation.
+        self.recorder: Optional[BackgroundRecorder] = None
+        # The properties checked when their buses change, starting with the assertions of the code.
+        self.monitors = Monitors()
+
+        for id in self.get_values():
+            if id.rsplit('.', 1)[-1].startswith(ASSERTION_PREFIX):
+                self.monitor(id, [id], bool)
 
     def __str__(self) -> str:
         return self.component.__str__()
@@ -59,74 +94,795 @@ class TestBench:
         else:
             self.time_unit = time_unit
 
-    def dump_vcd(self):
-        header_metadata = '' \
-            f'$version Generated by Flote v{VERSION} - {CODENAME} $end\n' \
-            f'$date {datetime.now().strftime(r"%Y-%m-%d %H:%M:%S")} $end\n' \
-            f'$timescale 1{self.time_unit} $end\n'
+    def __enter__(self) -> 'TestBench':
+        return self
 
-        header_metadata += '\n$comment Hello from Theresina. $end\n'
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-        header_declaration = f'\n$scope module {self.component.id_} $end\n'
+    @property
+    def waves(self) -> WaveStore:
+        """The value changes recorded in memory, after the ones recorded in the background."""
+        self.sync()
 
-        # Check which backend is being used
-        is_rust = isinstance(self.component, RustComponent)
+        return self.wave_store
 
-        if is_rust:
-            # Rust backend: busses is Dict[str, str]
-            buses_dict = self.component.busses
-            for bit_name, bit_value in buses_dict.items():
-                header_declaration += (
-                    f'\t$var wire {len(bit_value)} {bit_name} {bit_name} $end\n'
-                )
-        else:
-            # Python backend: buses is Dict[str, BaseBus]
-            for bit_name, bit_bus in self.component.buses.items():
-                header_declaration += (
-                    f'\t$var wire {len(bit_bus.value.raw_value)} {bit_name} {bit_name} $end\n'
-                )
+    @property
+    def samples(self) -> tuple[WaveSample, ...]:
+        """
+        The samples kept in memory, built from the changes of each bus in `waves`.
 
-        header_declaration += '$upscope $end\n\n'
+        They are a read-only copy, built on each access. To change the samples, assign a new
+        sequence of them, which replaces the changes in `waves`.
+        """
+        self.sync()
 
-        header = (
-            header_metadata +
-            header_declaration +
-            '$enddefinitions $end\n'
+        return tuple(
+            WaveSample(time, [Signal(id, value) for id, value in changes.items()])
+            for time, changes in self.wave_store.iter_changes()
         )
 
-        datasec = ''
+    @samples.setter
+    def samples(self, samples: Sequence[WaveSample]) -> None:
+        self.sync()
+        self.wave_store.clear()
+
+        for sample in samples:
+            self.wave_store.write(
+                sample.time, {signal.id: signal.value for signal in sample.signals}
+            )
+
+    def get_widths(self) -> dict[str, int]:
+        """This method returns the width of each recorded bus."""
+        if self.recorded is not None:
+            return dict(self.recorded)
+
+        return {id: len(value) for id, value in self.get_values().items()}
+
+    def set_filter(
+        self,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+        depth: int | None = None,
+    ) -> list[str]:
+        """
+        This method selects the buses that are recorded, all of them by default.
+
+        The values of the other buses are never converted to strings, so recording only the ports
+        of a design with many subcomponents is much cheaper. The filter must be set before the
+        first update.
+
+        Args:
+            include (list): Glob patterns of the buses to record, as `'*'` or `'ha1.*'`.
+            exclude (list): Glob patterns of the buses not to record, even if included.
+            depth (int): The maximum depth of the recorded buses in the hierarchy of instances,
+                `0` for the buses of the top component only.
+
+        Returns:
+            list: The ids of the recorded buses.
+        """
+        if self.started:
+            raise ValueError('The recording filter must be set before the simulation starts.')
+
+        if include is None and exclude is None and depth is None:
+            self.recorded = None
+        else:
+            self.recorded = {
+                id: len(value) for id, value in self.get_values().items()
+                if (include is None or any(fnmatchcase(id, pattern) for pattern in include))
+                and not (exclude and any(fnmatchcase(id, pattern) for pattern in exclude))
+                and (depth is None or id.count('.') <= depth)
+            }
+
+        if isinstance(self.component, RustComponent):
+            self.component.set_recorded(None if self.recorded is None else list(self.recorded))
+
+        return list(self.get_widths())
+
+    def write_samples(self, sink: WaveSink) -> None:
+        """This method writes the samples kept in memory to a sink and closes it."""
+        self.sync()
+        sink.open(self.component.id_, self.get_widths(), self.time_unit)
+
+        for time, changes in self.wave_store.iter_changes():
+            sink.write(time, changes)
 
-        for sample in self.samples:
-            datasec += f"\n#{sample.time}\n\n"
+        sink.close(self.s_time)
 
-            for signal in sample.signals:
-                bits = f'b{signal.value}'
-                datasec += f"{bits} {signal.id}\n"
+    def dump_vcd(self) -> str:
+        """This method returns the vcd file of the samples kept in memory."""
+        buffer = StringIO()
+        self.write_samples(VcdWriter(buffer))
 
-        return header + datasec + f'\n#{self.s_time}\n'
+        return buffer.getvalue()
 
     def save_vcd(self, file_path: str) -> None:
         """This method saves the vcd file."""
-        with open(file_path, 'w') as f:
-            f.write(self.dump_vcd())
-            f.close()
+        self.write_samples(VcdWriter(file_path))
+
+    def attach(self, sink: WaveSink, keep_samples: Optional[bool] = None) -> None:
+        """
+        This method sends the next value changes to a sink, while the simulation runs.
+
+        If the simulation already started, the sink receives the current values of all the buses.
+        When `keep_samples` is given, it sets if the samples are also kept in memory until the
+        sinks are closed, then the previous setting is restored.
+        """
+        self.sync()
+        sink.open(self.component.id_, self.get_widths(), self.time_unit)
+
+        if self.started:
+            sink.write(self.s_time, self.get_recorded_values())
+
+        self.sinks.append(sink)
+
+        if keep_samples is not None:
+            if self.saved_keep_samples is None:
+                self.saved_keep_samples = self.keep_samples
+
+            self.keep_samples = keep_samples
+
+    def stream_vcd(
+        self,
+        file_path: str | Path,
+        buffer_size: int = BUFFER_SIZE,
+        flush_interval: Optional[float] = None,
+        keep_samples: Optional[bool] = None,
+    ) -> VcdWriter:
+        """
+        This method writes the vcd file while the simulation runs.
+
+        The header is written now and the value changes are appended after each update, through
+        a write buffer of `buffer_size` bytes that is flushed at least every `flush_interval`
+        seconds when given. The file is finished by `close`.
+        """
+        writer = VcdWriter(file_path, buffer_size, flush_interval)
+        self.attach(writer, keep_samples)
+
+        return writer
+
+    def save_wave(self, file_path: str | Path, compression: str = 'zlib') -> None:
+        """This method saves the samples kept in memory in a compressed binary waveform file."""
+        self.write_samples(WaveFileWriter(file_path, compression))
+
+    def stream_wave(
+        self,
+        file_path: str | Path,
+        compression: str = 'zlib',
+        block_size: int = BLOCK_SIZE,
+        keep_samples: Optional[bool] = None,
+    ) -> WaveFileWriter:
+        """
+        This method writes a compressed binary waveform file while the simulation runs.
+
+        The value changes are compressed in blocks of `block_size` changes, with `zlib` or `lzma`.
+        The file can be read and converted to VCD with `WaveFileReader`, and is finished by
+        `close`.
+        """
+        writer = WaveFileWriter(file_path, compression, block_size)
+        self.attach(writer, keep_samples)
+
+        return writer
+
+    def spill_waves(
+        self, file_path: Optional[str | Path] = None, chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        """
+        This method bounds the memory used by the samples kept in memory.
+
+        When `chunk_size` changes are recorded, they are appended to a file (a temporary one by
+        default) and read back through `mmap` to be dumped or queried, so long simulations don't
+        lose any samples.
+        """
+        self.sync()
+        self.wave_store.enable_spill(file_path, chunk_size)
+
+    def record_in_background(self, queue_size: int = QUEUE_SIZE) -> None:
+        """
+        This method moves the recording of the changes to a background thread.
+
+        The updates pass the new values to the thread through a queue of `queue_size` updates,
+        and the thread converts them to strings and writes them to the sinks and to the samples
+        kept in memory. It pays off with the Rust backend, which releases the GIL while the
+        component stabilizes, so the formatting, compression and file writes run at the same
+        time. When the queue is full, the updates wait for the thread, so no changes are lost.
+        The samples and the sinks are up to date after `flush`, and the thread is stopped by
+        `close`.
+        """
+        if self.recorder is None:
+            self.recorder = BackgroundRecorder(queue_size)
+
+    def sync(self) -> None:
+        """This method waits for the changes being recorded in the background."""
+        if self.recorder is not None:
+            self.recorder.wait()
+
+    def flush(self) -> None:
+        """This method flushes the sinks."""
+        self.sync()
+
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        """
+        This method finishes the sinks at the current time and detaches them.
+
+        The sinks are closed even when the background recording failed, whose error is raised
+        after them.
+        """
+        recorder, self.recorder = self.recorder, None
+
+        try:
+            if recorder is not None:
+                recorder.stop()
+        finally:
+            for sink in self.sinks:
+                sink.close(self.s_time)
+
+            self.sinks = []
+
+            if self.saved_keep_samples is not None:
+                self.keep_samples = self.saved_keep_samples
+                self.saved_keep_samples = None
+
+    def port(self, id: str):
+        """
+        This method returns a handle to read and write a bus as an int.
+
+        The handle is bound to the bus, so no names are looked up and no strings are parsed when
+        it is used, which makes it the fastest way to drive the component in tight loops. Writes
+        stabilize the component but don't record samples, the next update records the values of
+        all the buses.
+        """
+        return self.component.port(id)
+
+    def get_values(self) -> dict[str, str]:
+        """This method returns the current values of the buses, as in the VCD file."""
+        if isinstance(self.component, RustComponent):
+            return self.component.busses
+        else:
+            return {id: bus.get_vcd_repr() for id, bus in self.component.buses.items()}
+
+    def get_recorded_values(self) -> dict[str, str]:
+        """This method returns the current values of the recorded buses."""
+        if self.recorded is None:
+            return self.get_values()
+
+        if isinstance(self.component, RustComponent):
+            values = self.component.busses
+            return {id: values[id] for id in self.recorded}
+        else:
+            buses = self.component.buses
+            return {id: buses[id].get_vcd_repr() for id in self.recorded}
 
     def update(self, new_values: dict[str, str]) -> None:
+        """
+        This method updates the inputs of the component and records the buses that changed.
+
+        The first sample has the values of all the recorded buses, the next ones only the changes,
+        unless the component changed without being recorded (see `needs_resync`). The updates at
+        the same time are coalesced in a single sample.
+        """
+        full = self.needs_resync()
         # Check which backend is being used
         is_rust = isinstance(self.component, RustComponent)
         if is_rust:
             # Rust backend: busses is Dict[str, str]
             assert isinstance(self.component, RustComponent)
-            sample = WaveSample(self.s_time, [])
-            self.component.update_and_get(new_values)
-            buses_dict = self.component.busses
-            for id, value in buses_dict.items():
-                sample.signals.append(Signal(id, value))
+            # The monitors need the changes of all the buses, not only the recorded ones
+            monitored = bool(self.monitors)
+            changes = self.component.update_and_get(
+                new_values, changes_only=not full,
+                recorded_only=self.recorded is not None and not monitored
+            )
+
+            if monitored:
+                changes = self.check_changes(changes)
         else:
             # Python backend: buses is Dict[str, BaseBus]
-            sample = WaveSample(self.s_time, [])
-            self.component.update_signals(new_values)
-            for id, bus in self.component.buses.items():
-                sample.signals.append(Signal(id, bus.get_vcd_repr()))
+            changed = self.component.update_signals(new_values)
+
+            if self.monitors:
+                self.check_changed(changed, full)
+
+            changes = self.get_changes(changed, full)
+
+        self.record(changes)
+
+    def needs_resync(self) -> bool:
+        """
+        This method checks if the next sample must have the values of all the recorded buses.
+
+        It is the first sample, or the component changed without being recorded (by ports, a
+        `play` without recording, a sweep or a batch of the Rust backend), so the changes since
+        the last sample are unknown.
+        """
+        dirty = self.component.take_dirty()
+
+        return dirty or self.resync or not self.started
+
+    def monitor(
+        self, name: str, buses: Sequence[str], predicate: Callable[..., bool]
+    ) -> Monitor:
+        """
+        This method adds a property checked whenever one of its buses changes.
+
+        The predicate gets the values of the buses as ints, in order, and a failure is recorded
+        with the time when it returns false. It is evaluated right away with the current values,
+        so a property that never holds is reported even if its buses never change. The buses must
+        be bit buses. The assertions of the code are added as monitors named after the id of
+        their buses. The writes through ports are checked by the next update and the batches
+        aren't checked.
+
+        Example:
+            `tb.monitor('not_both', ['s', 'r'], lambda s, r: not (s and r))`
+        """
+        monitor = Monitor(name, buses, predicate)
+        self.monitors.add(
+            monitor, self.s_time, {id: self.port(id).read() for id in monitor.buses}
+        )
+
+        return monitor
+
+    @property
+    def failures(self) -> list[Failure]:
+        """The checks of the monitors that failed, in order."""
+        return self.monitors.failures
+
+    def check_changed(self, changed: list[str], full: bool = False) -> None:
+        """
+        This method checks the monitors of the Python buses that changed, of all the monitored
+        buses when `full` is set, as the component may have changed without being checked.
+        """
+        buses = self.component.buses
+
+        if full:
+            changed = list(self.monitors.by_bus)
+
+        self.monitors.check(self.s_time, changed, lambda id: buses[id].value.bits)
+
+    def check_changes(self, changes: dict[str, str]) -> dict[str, str]:
+        """This method checks the monitors of the Rust changes, returning the recorded ones."""
+        self.monitors.check(self.s_time, changes, lambda id: int(changes[id], 2))
+
+        if self.recorded is None:
+            return changes
+
+        return {id: value for id, value in changes.items() if id in self.recorded}
+
+    def get_changes(self, changed: list[str], full: bool = False) -> dict[str, Any]:
+        """
+        This method returns the values to record after the Python component changed, of all the
+        recorded buses when `full` is set.
+        """
+        assert isinstance(self.component, PythonComponent)
+        buses = self.component.buses
+        recorded = self.recorded
+
+        if full:
+            changed = buses if recorded is None else recorded
+        elif recorded is not None:
+            changed = [id for id in changed if id in recorded]
+
+        if self.recorder is None:
+            return {id: buses[id].get_vcd_repr() for id in changed}
+
+        # The values of the bit buses are immutable, the thread converts them to strings
+        return {
+            id: bus.value if isinstance(bus, BitBus) else bus.get_vcd_repr()
+            for id in changed for bus in [buses[id]]
+        }
+
+    def play(self, file_path: str | Path, record: bool = True) -> int:
+        """
+        This method applies the rows of a stimulus file to the inputs of the component.
+
+        The file is memory mapped and each row is written to the inputs as ints, without parsing
+        strings, then the monitors are checked and the test bench waits for the delay of the
+        row. The Rust backend plays the file without going back to Python for each row, and
+        returns the changes in chunks of `PLAYBACK_ROWS` rows, so the memory used doesn't grow
+        with the file. When `record` is false no samples are recorded, which is the fastest way
+        to drive the component.
+
+        Returns:
+            int: The number of rows played.
+        """
+        resync = self.needs_resync()
+        full = record and resync
+
+        if not record:
+            # The changes of the rows aren't recorded, the next sample has all the buses
+            self.resync = True
+
+        if isinstance(self.component, RustComponent):
+            monitored = bool(self.monitors)
+            # The monitors check the first row with all the buses, as the recording does
+            player = self.component.open_stimulus(
+                str(file_path), record or monitored,
+                changes_only=not (full or monitored and resync),
+                recorded_only=self.recorded is not None and not monitored
+            )
+
+            while rows := player.play(PLAYBACK_ROWS):
+                for delay, changes in rows:
+                    if monitored:
+                        changes = self.check_changes(changes)
+
+                    if record:
+                        self.record(changes)
+
+                    self.wait(delay)
+
+            if not (record or monitored):
+                self.wait(player.total_delay)
+
+            return player.n_rows
+
+        with StimulusFile(file_path) as stimulus:
+            update_ints = self.component.update_ints
+
+            for delay, values in stimulus:
+                changed = update_ints(values)
+
+                if self.monitors:
+                    self.check_changed(changed, resync)
+
+                if record:
+                    self.record(self.get_changes(changed, full))
+                    full = False
+
+                resync = False
+
+                self.wait(delay)
+
+            return len(stimulus)
+
+    def record(self, changes: dict[str, str]) -> None:
+        """This method records the new values of some buses at the current time."""
+        if not changes:
+            return
+
+        self.started = True
+        self.resync = False
+
+        if self.recorder is None:
+            self.write_changes(self.s_time, changes)
+        else:
+            self.recorder.submit(self.write_values, self.s_time, changes)
+
+    def write_values(self, time: int, values: dict[str, Any]) -> None:
+        """This method converts the new values to strings and writes them, see `write_changes`."""
+        self.write_changes(time, {
+            id: value if isinstance(value, str) else value.get_vcd_repr()
+            for id, value in values.items()
+        })
+
+    def write_changes(self, time: int, changes: dict[str, str]) -> None:
+        """This method writes the changes to the sinks and the samples kept in memory."""
+        for sink in self.sinks:
+            sink.write(time, changes)
+
+        if self.keep_samples:
+            self.wave_store.write(time, changes)
+
+    def replay(self, file_path: str | Path, inputs: list[str] | None = None) -> None:
+        """
+        This method drives the inputs of the component with the changes of a VCD file.
+
+        The file is read as a stream, so files of any size are replayed in constant memory. The
+        times of the file are taken in the time unit of the test bench, from the current time,
+        and the unknown and high impedance bits are replayed as 0.
+
+        Args:
+            file_path (str): The path of the VCD file, with the buses named as in the component.
+            inputs (list): The buses replayed, all the inputs of the component in the file by
+                default. The other buses of the file are ignored.
+        """
+        with VcdReader(file_path) as reader:
+            if inputs is None:
+                inputs = [id for id in self.component.get_inputs() if id in reader.widths]
+
+            replayed = set(inputs)
+            start = self.s_time
+            unknown = str.maketrans('xz', '00')
+
+            for time, changes in reader.iter_changes():
+                new_values = {
+                    id: value.translate(unknown) for id, value in changes.items()
+                    if id in replayed
+                }
+
+                if new_values:
+                    self.wait(start + time - self.s_time)
+                    self.update(new_values)
+
+            if reader.end_time is not None:
+                self.wait(max(start + reader.end_time - self.s_time, 0))
+
+    def run_batch(
+        self, inputs: dict[str, Sequence[int]], outputs: list[str] | None = None
+    ) -> dict[str, Any]:
+        """
+        This method simulates many independent stimuli at once.
+
+        Only combinational designs (without feedback loops or HLS components) are supported, so
+        each result depends only on its stimulus. The Python backend puts each stimulus in a bit
+        lane and evaluates all of them together with bitwise operations, in a single pass over
+        the design. The Rust backend updates the component for each stimulus in turn and
+        restores the inputs at the end. The inputs not given keep their current value, the
+        values of the component and the samples are not changed.
+
+        Args:
+            inputs (dict): The values of each input, as lists of ints or NumPy arrays of the same
+                length. The first bit of the bus is the most significant one.
+            outputs (list): The buses to return, all of them by default.
+
+        Returns:
+            dict: The values of the buses for each stimulus, as NumPy arrays when the inputs are.
+        """
+        counts = {len(values) for values in inputs.values()}
+
+        if len(counts) > 1:
+            raise ValueError(f'The inputs must have the same number of values, got {counts}.')
+
+        count = counts.pop() if counts else 1
+        as_array = any(is_array(values) for values in inputs.values())
+
+        if isinstance(self.component, RustComponent):
+            return self.run_batch_rust(inputs, outputs, count, as_array)
+
+        buses = self.component.buses
+        outputs = list(buses) if outputs is None else outputs
+        mask = (1 << count) - 1
+        planes = {}
+
+        for id, values in inputs.items():
+            width = buses[id].value.width
+            check_values(id, values, width)
+            planes[id] = pack_lanes(values, width)
+
+        result = self.component.run_lanes(planes, mask)
+
+        return {id: unpack_lanes(result[id], count, as_array) for id in outputs}
+
+    def run_batch_rust(
+        self,
+        inputs: dict[str, Sequence[int]],
+        outputs: list[str] | None,
+        count: int,
+        as_array: bool,
+    ) -> dict[str, Any]:
+        """Run a batch updating the Rust component for each stimulus, see `run_batch`."""
+        assert isinstance(self.component, RustComponent)
+
+        # With feedback loops, the values left by a stimulus would change the next results
+        if self.component.cyclic:
+            raise SimulationError('Batch simulation requires a design without feedback loops.')
+
+        p_values = self.component.busses
+        outputs = list(p_values) if outputs is None else outputs
+        widths = {id: len(p_values[id]) for id in inputs}
+        result: dict[str, list[int]] = {id: [] for id in outputs}
+
+        for id, values in inputs.items():
+            check_values(id, values, widths[id])
+
+        for i in range(count):
+            sample = self.component.update_and_get({
+                id: format(int(values[i]), f'0{widths[id]}b') for id, values in inputs.items()
+            })
+
+            for id in outputs:
+                result[id].append(int(sample[id], 2))
+
+        self.component.update_signals({id: p_values[id] for id in inputs})
+        self.resync = True
+
+        if as_array:
+            return {id: to_array(values, len(p_values[id])) for id, values in result.items()}
+
+        return result
+
+    def compare(
+        self, reference: Reference, inputs: dict[str, Sequence[int]] | None = None
+    ) -> Comparison:
+        """
+        This method compares the outputs of the component against a vectorized reference model.
+
+        When `inputs` is given, its vectors are simulated at once with `run_batch` and the inputs
+        not given keep their current values. Otherwise the vectors are the times of the recorded
+        waves, with the values of the recorded buses at each time, so the inputs and the outputs
+        compared must be recorded. The model gets the inputs as NumPy arrays, of the same types
+        as the outputs, and returns the expected values of some outputs, so the vectors are
+        checked without a loop in Python.
+
+        Example:
+            `tb.compare(lambda v: {'sum': v['a'] ^ v['b'] ^ v['cin']}, inputs)`
+
+        Returns:
+            Comparison: The indices of the vectors where the outputs mismatched.
+        """
+        if np is None:
+            raise ImportError('NumPy is required to compare with a reference model.')
+
+        if inputs is None:
+            table = self.waves.to_numpy()
+            widths = {id: trace.width for id, trace in self.wave_store.traces.items()}
+
+            if len(table['time']) == 0:
+                raise ValueError('There are no recorded samples to compare.')
+
+            missing = [id for id in self.component.get_inputs() if id not in widths]
+
+            if missing:
+                raise ValueError(
+                    f'The inputs {missing} weren\'t recorded, so the reference model can\'t get '
+                    'their values. Record them or pass the inputs to simulate.'
+                )
+
+            arrays = {id: table[id] for id in self.component.get_inputs()}
+            expected = reference(arrays)
+            missing = [id for id in expected if id not in widths]
+
+            if missing:
+                raise ValueError(f'The outputs {missing} weren\'t recorded.')
+
+            actual = {id: table[id] for id in widths}
+
+            return compare(arrays, actual, expected, widths, table['time'])
+
+        arrays = {}
+
+        for id, values in inputs.items():
+            width = self.port(id).width
+            check_values(id, values, width)
+            arrays[id] = to_array(values, width)
+
+        expected = reference(arrays)
+        actual = self.run_batch(arrays, list(expected))
+        widths = {id: self.port(id).width for id in expected}
+
+        return compare(arrays, actual, expected, widths)
+
+    def get_outputs(self, inputs: list[str]) -> list[str]:
+        """This method returns the bit buses that aren't in the inputs or assertions."""
+        if isinstance(self.component, RustComponent):
+            ids = [id for id in self.component.busses if id not in inputs]
+        else:
+            ids = [
+                id for id, bus in self.component.buses.items()
+                if id not in inputs and isinstance(bus, BitBus)
+            ]
+
+        return [id for id in ids if not id.rsplit('.', 1)[-1].startswith(ASSERTION_PREFIX)]
+
+    def run(
+        self,
+        stimuli: Iterable[tuple[int, dict[str, str | int]]],
+        outputs: list[str] | None = None,
+    ) -> Iterator[tuple[int, dict[str, int]]]:
+        """
+        This method simulates a stream of stimuli, yielding the outputs after each one.
+
+        The stimuli are taken from the iterable only when the previous results are consumed, so
+        stimuli from generators or files can be simulated and checked with bounded memory. Each
+        stimulus is recorded like an `update`.
+
+        Args:
+            stimuli (iterable): The stimuli, as the time to wait before each one and the new values
+                of the inputs, as strings or ints (the first bit is the most significant one).
+            outputs (list): The buses to read, all of them except the inputs by default.
+
+        Yields:
+            tuple: The time of the stimulus and the values of the outputs as ints.
+        """
+        if outputs is None:
+            outputs = self.get_outputs(self.component.get_inputs())
+
+        ports = [(id, self.port(id)) for id in outputs]
+        widths: dict[str, int] = {}
+
+        for delay, inputs in stimuli:
+            self.wait(delay)
+            self.update(self.to_strings(inputs, widths))
+
+            yield self.s_time, {id: port.read() for id, port in ports}
+
+    def to_strings(
+        self, new_values: dict[str, str | int], widths: dict[str, int]
+    ) -> dict[str, str]:
+        """This method formats the int values as bits, caching the widths of the buses."""
+        strings = {}
+
+        for id, value in new_values.items():
+            if not isinstance(value, str):
+                if id not in widths:
+                    widths[id] = self.port(id).width
+
+                value = format(value, f'0{widths[id]}b')
+
+            strings[id] = value
+
+        return strings
+
+    def sweep(
+        self, inputs: list[str] | None = None, outputs: list[str] | None = None
+    ) -> Iterator[tuple[int, dict[str, int]]]:
+        """
+        This method goes through all the combinations of the inputs in Gray code order.
+
+        Only one input bit changes from one combination to the next, so each update stabilizes
+        only the buses influenced by a single input. The inputs are restored when the sweep ends
+        and no samples are recorded.
+
+        Args:
+            inputs (list): The inputs to sweep, all of them by default. The other ones keep their
+                current values.
+            outputs (list): The buses to read, all of them except the swept inputs by default.
+
+        Yields:
+            tuple: The index of the combination, with the inputs concatenated in the given order
+                (the first bit is the most significant one), and the values of the outputs.
+        """
+        is_rust = isinstance(self.component, RustComponent)
+        buses = None if is_rust else self.component.buses
+        p_values = self.get_values()
+        inputs = self.component.get_inputs() if inputs is None else inputs
+        outputs = self.get_outputs(inputs) if outputs is None else outputs
+
+        widths = [len(p_values[id]) for id in inputs]
+        # The input and the weight of each bit of the index, from the least significant one.
+        index_bits = [
+            (pos, 1 << shift) for pos in reversed(range(len(inputs)))
+            for shift in range(widths[pos])
+        ]
+        values = [0] * len(inputs)
+
+        def step(new_values: dict[str, str]) -> dict[str, int]:
+            if is_rust:
+                sample = self.component.update_and_get(new_values)
+                return {id: int(sample[id], 2) for id in outputs}
+            else:
+                self.component.update_signals(new_values)
+                return {id: buses[id].value.bits for id in outputs}
+
+        try:
+            index = 0
+            yield index, step({id: '0' * width for id, width in zip(inputs, widths)})
+
+            for i in range(1, 1 << len(index_bits)):
+                # The bit that changes is the lowest set bit of the step
+                bit = (i & -i).bit_length() - 1
+                pos, weight = index_bits[bit]
+                values[pos] ^= weight
+                index ^= 1 << bit
+
+                yield index, step({inputs[pos]: format(values[pos], f'0{widths[pos]}b')})
+        finally:
+            self.component.update_signals({id: p_values[id] for id in inputs})
+            # The restored values can differ from the recorded ones, in designs with state
+            self.resync = True
+
+    def truth_table(
+        self, inputs: list[str] | None = None, outputs: list[str] | None = None
+    ) -> dict[str, list[int]]:
+        """
+        This method collects the values of the outputs for all the combinations of the inputs.
+
+        The combinations are simulated in Gray code order, see `sweep`, and stored by index, so
+        the value of an output for a combination is `table[output][index]`.
+        """
+        inputs = self.component.get_inputs() if inputs is None else inputs
+        p_values = self.get_values()
+        size = 1 << sum(len(p_values[id]) for id in inputs)
+        table: dict[str, list[int]] = {}
+
+        for index, values in self.sweep(inputs, outputs):
+            if not table:
+                table = {id: [0] * size for id in values}
+
+            for id, value in values.items():
+                table[id][index] = value
 
-        self.samples.append(sample)
+        return table
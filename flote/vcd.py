@@ -0,0 +1,268 @@
+"""
+This module writes and reads the waves of a simulation in the Value Change Dump (VCD) format.
+"""
+from datetime import datetime
+from pathlib import Path
+from time import monotonic
+from typing import Iterator, Optional, TextIO
+
+from .sink import WaveSink
+
+VERSION = '0.4.0'
+CODENAME = 'Gambiarra'
+
+# The default size of the write buffer of the VCD files.
+BUFFER_SIZE = 1 << 20
+# The printable ASCII characters used in the identifier codes of the variables.
+CODE_CHARS = [chr(char) for char in range(33, 127)]
+
+
+def get_code(index: int) -> str:
+    """Get the identifier code of the variable of an index, the shortest ones come first."""
+    code = CODE_CHARS[index % len(CODE_CHARS)]
+    index //= len(CODE_CHARS)
+
+    while index:
+        index -= 1
+        code += CODE_CHARS[index % len(CODE_CHARS)]
+        index //= len(CODE_CHARS)
+
+    return code
+
+
+class Scope:
+    """This class represents a scope of the VCD header, with its variables and subscopes."""
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.vars: list[tuple[str, int, str]] = []  # The name, width and code of each variable
+        self.scopes: dict[str, 'Scope'] = {}
+
+    def add_var(self, path: list[str], width: int, code: str) -> None:
+        """Add a variable to the scope, creating the subscopes in its path."""
+        if len(path) == 1:
+            self.vars.append((path[0], width, code))
+        else:
+            scope = self.scopes.setdefault(path[0], Scope(path[0]))
+            scope.add_var(path[1:], width, code)
+
+    def get_lines(self, depth: int = 0) -> list[str]:
+        """Get the declaration lines of the scope."""
+        indent = '\t' * depth
+        lines = [f'{indent}$scope module {self.name} $end\n']
+
+        for name, width, code in self.vars:
+            lines.append(f'{indent}\t$var wire {width} {code} {name} $end\n')
+
+        for scope in self.scopes.values():
+            lines += scope.get_lines(depth + 1)
+
+        lines.append(f'{indent}$upscope $end\n')
+
+        return lines
+
+
+class VcdWriter(WaveSink):
+    """This class streams the value changes of a simulation to a VCD file.
+
+    The buses get short identifier codes and the ones of subcomponents are declared in the scopes
+    of their instances.
+
+    The header is written when the writer is opened and the changes are appended as the time
+    advances, so the memory used doesn't grow with the simulation. The changes of the current time
+    are held until it advances, so the ones at the same time are coalesced. The writes are
+    buffered and, when `flush_interval` is given, flushed to the file at least every
+    `flush_interval` seconds, so a partial file with all the past times can be read if the
+    simulation stops.
+    """
+    def __init__(
+        self,
+        file: str | Path | TextIO,
+        buffer_size: int = BUFFER_SIZE,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        if isinstance(file, (str, Path)):
+            self.file: TextIO = open(file, 'w', buffering=buffer_size)
+            self.owns_file = True
+        else:
+            self.file = file
+            self.owns_file = False
+
+        self.flush_interval = flush_interval
+        self.last_flush = monotonic()
+        self.time: Optional[int] = None
+        self.pending: dict[str, str] = {}  # The changes of the current time
+        self.codes: dict[str, str] = {}  # The identifier code of each bus
+
+    def open(self, component_id: str, widths: dict[str, int], time_unit: str) -> None:
+        lines = [
+            f'$version Generated by Flote v{VERSION} - {CODENAME} $end\n',
+            f'$date {datetime.now().strftime(r"%Y-%m-%d %H:%M:%S")} $end\n',
+            f'$timescale 1{time_unit} $end\n',
+            '\n$comment Hello from Theresina. $end\n',
+            '\n',
+        ]
+
+        # The buses of the subcomponents have the aliases of the instances as prefixes
+        scope = Scope(component_id)
+
+        for index, (id, width) in enumerate(widths.items()):
+            self.codes[id] = get_code(index)
+            scope.add_var(id.split('.'), width, self.codes[id])
+
+        lines += scope.get_lines()
+        lines.append('\n$enddefinitions $end\n')
+
+        self.file.write(''.join(lines))
+
+    def write(self, time: int, changes: dict[str, str]) -> None:
+        if time != self.time:
+            self.write_pending()
+            self.file.write(f'\n#{time}\n\n')
+            self.time = time
+
+        self.pending.update(changes)
+
+        if self.flush_interval is not None and monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def write_pending(self) -> None:
+        """Write the changes of the current time to the buffer."""
+        codes = self.codes
+        self.file.write(''.join([f'b{value} {codes[id]}\n' for id, value in self.pending.items()]))
+        self.pending = {}
+
+    def flush(self) -> None:
+        # The changes of the current time are kept, more of them can still come
+        self.file.flush()
+        self.last_flush = monotonic()
+
+    def close(self, end_time: int) -> None:
+        self.write_pending()
+        self.file.write(f'\n#{end_time}\n')
+
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+class VcdReader:
+    """This class reads the value changes of a VCD file as a stream.
+
+    The header is read when the reader is created, and the changes are parsed as they are
+    iterated, line by line, so files of any size are read in constant memory. The buses are named
+    by their path from the top scope, as `ha1.carry`, like the ones of the test bench.
+
+    The values are binary strings with the width of the bus, the ones of vectors written with fewer
+    bits are extended as in the VCD standard. The unknown (`x`) and high impedance (`z`) bits are
+    kept, and real variables are ignored.
+    """
+    def __init__(self, file_path: str | Path, buffer_size: int = BUFFER_SIZE) -> None:
+        self.file = open(file_path, 'r', buffering=buffer_size)
+        self.tokens = self.get_tokens()
+        self.component_id = ''
+        self.time_unit = ''
+        self.widths: dict[str, int] = {}
+        self.ids: dict[str, list[tuple[str, int]]] = {}  # The buses and widths of each code
+        self.end_time: Optional[int] = None  # The last time, known when the changes are read
+        self.read_header()
+
+    def __enter__(self) -> 'VcdReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def get_tokens(self) -> Iterator[str]:
+        for line in self.file:
+            yield from line.split()
+
+    def skip_section(self) -> list[str]:
+        """Read the tokens until the end of the section, returning them."""
+        tokens = []
+
+        for token in self.tokens:
+            if token == '$end':
+                break
+
+            tokens.append(token)
+
+        return tokens
+
+    def read_header(self) -> None:
+        scopes: list[str] = []
+
+        for token in self.tokens:
+            if token == '$scope':
+                _, name = self.skip_section()[:2]
+                self.component_id = self.component_id or name
+                scopes.append(name)
+            elif token == '$upscope':
+                self.skip_section()
+                scopes.pop()
+            elif token == '$var':
+                _, width, code, name = self.skip_section()[:4]
+                id = '.'.join(scopes[1:] + [name])
+                self.widths[id] = int(width)
+                self.ids.setdefault(code, []).append((id, int(width)))
+            elif token == '$timescale':
+                self.time_unit = ''.join(self.skip_section()).lstrip('0123456789')
+            elif token == '$enddefinitions':
+                self.skip_section()
+                return
+            elif token.startswith('$'):
+                self.skip_section()
+
+    def iter_changes(self) -> Iterator[tuple[int, dict[str, str]]]:
+        """Iterate over the changes of each time, in the order of the file.
+
+        The file is read as the changes are iterated, so they can be iterated only once.
+        """
+        ids = self.ids
+        time = 0
+        changes: dict[str, str] = {}
+
+        def change(value: str, code: str) -> None:
+            for id, width in ids.get(code, ()):
+                if len(value) < width:
+                    # Vectors are extended with 0, or with x or z when it is the first bit
+                    changes[id] = value.rjust(width, value[0] if value[0] in 'xz' else '0')
+                else:
+                    changes[id] = value[-width:]
+
+        for token in self.tokens:
+            first = token[0]
+
+            if first == '#':
+                new_time = int(token[1:])
+
+                if new_time != time and changes:
+                    yield time, changes
+                    changes = {}
+
+                time = new_time
+            elif first in 'bB':
+                change(token[1:].lower(), next(self.tokens))
+            elif first in '01xXzZ':
+                change(first.lower(), token[1:])
+            elif first in 'rR':
+                next(self.tokens)
+            elif token in ('$comment', '$attrbegin'):
+                self.skip_section()
+
+        if changes:
+            yield time, changes
+
+        self.end_time = time
+
+    def write_to(self, sink: WaveSink) -> None:
+        """Write all the changes to a sink and close it."""
+        sink.open(self.component_id, self.widths, self.time_unit)
+
+        for time, changes in self.iter_changes():
+            sink.write(time, changes)
+
+        sink.close(self.end_time or 0)
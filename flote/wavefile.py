@@ -0,0 +1,456 @@
+"""
+This module writes and reads the waves of a simulation in a compressed binary format, much smaller
+than VCD files on long simulations.
+
+The file has a header with the buses, a sequence of blocks and an index with the time range of
+each block. Each block is compressed on its own and starts with the values of all the buses (a
+key frame), so it can be decoded without the previous ones. After the key frame come the times of
+the block, each one with the time delta from the previous time, the number of changes and, for
+each change, the delta of the index of the bus and its new value XOR the previous one.
+
+The values that aren't binary, with unknown bits or from HLS components, are kept as text: the
+key frame ends with the text values of the buses and each change has a flag, with the text value
+in UTF-8 instead of the XOR when it is set.
+
+If the simulation stops before the file is closed, there is no index, but all the blocks written
+so far can still be read.
+"""
+import json
+import lzma
+import struct
+import zlib
+from bisect import bisect_right
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from .sink import WaveSink
+
+MAGIC = b'FLWV'
+END_MAGIC = b'FLWE'
+FORMAT_VERSION = 2
+COMPRESSIONS = ['zlib', 'lzma']
+
+HEADER = struct.Struct('<4sBBI')  # Magic, format version, compression and metadata size
+BLOCK = struct.Struct('<qqII')  # First time, last time, raw size and compressed size
+INDEX_ENTRY = struct.Struct('<qqQ')  # First time, last time and offset of a block
+FOOTER = struct.Struct('<qQQ4s')  # End time, number of blocks, index offset and magic
+
+# The default number of value changes of a block.
+BLOCK_SIZE = 1 << 16
+
+Change = tuple[int, int | str]  # The index of a bus and its new value, as text if not binary
+
+
+class WaveFileError(Exception):
+    """This class represents an invalid waveform file."""
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def write_varint(buffer: bytearray, value: int) -> None:
+    """Append an unsigned int to a buffer, 7 bits per byte."""
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+
+    buffer.append(value)
+
+
+def read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """Read an unsigned int from the data, returning it and the position after it."""
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+
+        if byte < 0x80:
+            return value, pos
+
+        shift += 7
+
+
+def write_text(buffer: bytearray, value: str) -> None:
+    """Append a text value to a buffer, after its size."""
+    data = value.encode()
+    write_varint(buffer, len(data))
+    buffer += data
+
+
+def read_text(data: bytes, pos: int) -> tuple[str, int]:
+    """Read a text value from the data, returning it and the position after it."""
+    size, pos = read_varint(data, pos)
+
+    return data[pos:pos + size].decode(), pos + size
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    if compression == 'zlib':
+        return zlib.compress(data)
+    else:
+        return lzma.compress(data)
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    if compression == 'zlib':
+        return zlib.decompress(data)
+    else:
+        return lzma.decompress(data)
+
+
+class WaveFileWriter(WaveSink):
+    """This class streams the value changes of a simulation to a binary waveform file.
+
+    The changes are encoded in a block in memory, that is compressed and written when it reaches
+    `block_size` changes or the writer is flushed. The changes of the current time are held until
+    it advances, so the ones at the same time are coalesced.
+    """
+    def __init__(
+        self,
+        file: str | Path | BinaryIO,
+        compression: str = 'zlib',
+        block_size: int = BLOCK_SIZE,
+    ) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f'Invalid compression "{compression}". Valid compressions are: {COMPRESSIONS}'
+            )
+
+        if isinstance(file, (str, Path)):
+            self.file: BinaryIO = open(file, 'wb')
+            self.owns_file = True
+        else:
+            self.file = file
+            self.owns_file = False
+
+        self.compression = compression
+        self.block_size = block_size
+        self.indices: dict[str, int] = {}  # The index of each bus
+        self.widths: list[int] = []
+        self.n_bytes: list[int] = []  # The number of bytes of the value of each bus
+        self.state: list[int | str] = []  # The last value of each bus, as text if not binary
+        self.time: Optional[int] = None
+        self.pending: dict[str, str] = {}  # The changes of the current time
+        self.block = bytearray()
+        self.block_changes = 0
+        self.block_times: Optional[tuple[int, int]] = None  # The first and last times of the block
+        self.index: list[tuple[int, int, int]] = []
+
+    def open(self, component_id: str, widths: dict[str, int], time_unit: str) -> None:
+        metadata = json.dumps({
+            'component': component_id,
+            'time_unit': time_unit,
+            'buses': [[id, width] for id, width in widths.items()],
+        }).encode()
+
+        self.file.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, COMPRESSIONS.index(self.compression), len(metadata)
+        ))
+        self.file.write(metadata)
+
+        self.indices = {id: index for index, id in enumerate(widths)}
+        self.widths = list(widths.values())
+        self.n_bytes = [(width + 7) // 8 for width in widths.values()]
+        self.state = [0] * len(widths)
+
+    def write(self, time: int, changes: dict[str, str]) -> None:
+        if time != self.time:
+            self.write_pending()
+            self.time = time
+
+        self.pending.update(changes)
+
+    def write_pending(self) -> None:
+        """Encode the changes of the current time in the block."""
+        if not self.pending:
+            return
+
+        if self.block_times is None:
+            self.start_block()
+            self.block_times = (self.time, self.time)
+            previous_time = self.time
+        else:
+            previous_time = self.block_times[1]
+            self.block_times = (self.block_times[0], self.time)
+
+        block = self.block
+        state = self.state
+        widths = self.widths
+        changes = sorted((self.indices[id], value) for id, value in self.pending.items())
+
+        write_varint(block, self.time - previous_time)
+        write_varint(block, len(changes))
+        previous_index = -1
+
+        for index, text in changes:
+            is_text = len(text) != widths[index] or bool(text.strip('01'))
+            # The delta of the index, with the flag of the text values in the lowest bit
+            write_varint(block, (index - previous_index - 1) << 1 | is_text)
+            previous_index = index
+
+            if is_text:
+                write_text(block, text)
+                state[index] = text
+                continue
+
+            value = int(text, 2)
+            previous = state[index]
+
+            if isinstance(previous, str):
+                previous = 0
+
+            block += (value ^ previous).to_bytes(self.n_bytes[index], 'big')
+            state[index] = value
+
+        self.block_changes += len(changes)
+        self.pending = {}
+
+        if self.block_changes >= self.block_size:
+            self.write_block()
+
+    def start_block(self) -> None:
+        """Start a block with the key frame of the current values, the text ones at the end."""
+        texts = []
+
+        for index, (value, n_bytes) in enumerate(zip(self.state, self.n_bytes)):
+            if isinstance(value, str):
+                texts.append((index, value))
+                value = 0
+
+            self.block += value.to_bytes(n_bytes, 'big')
+
+        write_varint(self.block, len(texts))
+
+        for index, value in texts:
+            write_varint(self.block, index)
+            write_text(self.block, value)
+
+    def write_block(self) -> None:
+        """Compress the block and write it to the file."""
+        if self.block_times is None:
+            return
+
+        data = compress(bytes(self.block), self.compression)
+        self.index.append((*self.block_times, self.file.tell()))
+        self.file.write(BLOCK.pack(*self.block_times, len(self.block), len(data)))
+        self.file.write(data)
+
+        self.block = bytearray()
+        self.block_changes = 0
+        self.block_times = None
+
+    def flush(self) -> None:
+        # The changes of the current time are kept, more of them can still come
+        self.write_block()
+        self.file.flush()
+
+    def close(self, end_time: int) -> None:
+        self.write_pending()
+        self.write_block()
+
+        index_offset = self.file.tell()
+
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+
+        self.file.write(FOOTER.pack(end_time, len(self.index), index_offset, END_MAGIC))
+
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+class WaveFileReader:
+    """This class reads a binary waveform file.
+
+    The blocks are found with the index of the file, or by reading all the block headers when the
+    file wasn't closed. The changes can be read from any time, decoding only the blocks from it.
+    """
+    def __init__(self, file_path: str | Path) -> None:
+        self.file = open(file_path, 'rb')
+
+        magic, version, compression, metadata_size = HEADER.unpack(self.file.read(HEADER.size))
+
+        if magic != MAGIC:
+            raise WaveFileError(f'"{file_path}" is not a Flote waveform file.')
+
+        if version != FORMAT_VERSION:
+            raise WaveFileError(f'Unsupported waveform file version {version}.')
+
+        metadata = json.loads(self.file.read(metadata_size))
+        self.compression = COMPRESSIONS[compression]
+        self.component_id: str = metadata['component']
+        self.time_unit: str = metadata['time_unit']
+        self.widths: dict[str, int] = {id: width for id, width in metadata['buses']}
+        self.ids = list(self.widths)
+        self.n_bytes = [(width + 7) // 8 for width in self.widths.values()]
+        self.data_offset = self.file.tell()
+        self.index, self.end_time = self.read_index()
+        self.first_times = [first_time for first_time, _, _ in self.index]
+
+    def __enter__(self) -> 'WaveFileReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def read_index(self) -> tuple[list[tuple[int, int, int]], int]:
+        """Read the index and the end time from the footer, or rebuild them from the blocks."""
+        size = self.file.seek(0, 2)
+
+        if size - self.data_offset >= FOOTER.size:
+            self.file.seek(size - FOOTER.size)
+            end_time, n_blocks, index_offset, magic = FOOTER.unpack(self.file.read(FOOTER.size))
+
+            if magic == END_MAGIC:
+                self.file.seek(index_offset)
+                data = self.file.read(n_blocks * INDEX_ENTRY.size)
+
+                return list(INDEX_ENTRY.iter_unpack(data)), end_time
+
+        # The file wasn't closed, so the complete blocks are read one by one
+        index = []
+        offset = self.data_offset
+
+        while offset + BLOCK.size <= size:
+            self.file.seek(offset)
+            first_time, last_time, _, compressed_size = BLOCK.unpack(self.file.read(BLOCK.size))
+
+            if offset + BLOCK.size + compressed_size > size:
+                break
+
+            index.append((first_time, last_time, offset))
+            offset += BLOCK.size + compressed_size
+
+        return index, index[-1][1] if index else 0
+
+    def read_block(
+        self, offset: int
+    ) -> tuple[list[int | str], Iterator[tuple[int, list[Change]]]]:
+        """Read a block, returning its key frame and an iterator over its times.
+
+        Each time comes with the new values of the buses that changed, by bus index.
+        """
+        self.file.seek(offset)
+        first_time, _, _, compressed_size = BLOCK.unpack(self.file.read(BLOCK.size))
+        data = decompress(self.file.read(compressed_size), self.compression)
+
+        state: list[int | str] = []
+        pos = 0
+
+        for n_bytes in self.n_bytes:
+            state.append(int.from_bytes(data[pos:pos + n_bytes], 'big'))
+            pos += n_bytes
+
+        n_texts, pos = read_varint(data, pos)
+
+        for _ in range(n_texts):
+            index, pos = read_varint(data, pos)
+            state[index], pos = read_text(data, pos)
+
+        def steps(pos: int) -> Iterator[tuple[int, list[Change]]]:
+            values = list(state)
+            time = first_time
+
+            while pos < len(data):
+                delta, pos = read_varint(data, pos)
+                n_changes, pos = read_varint(data, pos)
+                time += delta
+                index = -1
+                changes = []
+
+                for _ in range(n_changes):
+                    index_delta, pos = read_varint(data, pos)
+                    index += (index_delta >> 1) + 1
+
+                    if index_delta & 1:
+                        values[index], pos = read_text(data, pos)
+                    else:
+                        n_bytes = self.n_bytes[index]
+                        previous = values[index]
+                        delta = int.from_bytes(data[pos:pos + n_bytes], 'big')
+                        values[index] = delta ^ (0 if isinstance(previous, str) else previous)
+                        pos += n_bytes
+
+                    changes.append((index, values[index]))
+
+                yield time, changes
+
+        return state, steps(pos)
+
+    def iter_changes(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Iterator[tuple[int, dict[str, str]]]:
+        """
+        Iterate over the value changes, as written by the test bench.
+
+        When `start` is given, the first item has the values of all the buses at that time and
+        only the blocks from it are decoded. The changes after `end` are not read.
+        """
+        if not self.index:
+            return
+
+        block = 0 if start is None else max(bisect_right(self.first_times, start) - 1, 0)
+        state: Optional[list[int | str]] = None
+        ids = self.ids
+        widths = [self.widths[id] for id in ids]
+
+        def to_str(index: int, value: int | str) -> str:
+            return value if isinstance(value, str) else format(value, f'0{widths[index]}b')
+
+        def get_state() -> dict[str, str]:
+            return {ids[index]: to_str(index, value) for index, value in enumerate(state)}
+
+        for _, _, offset in self.index[block:]:
+            key_frame, steps = self.read_block(offset)
+
+            if state is None:
+                state = key_frame
+
+            for time, changes in steps:
+                if start is not None:
+                    if start < time:
+                        # The values at the start are the ones before this time
+                        yield start, get_state()
+                        start = None
+                    else:
+                        for index, value in changes:
+                            state[index] = value
+
+                        if start == time:
+                            yield start, get_state()
+                            start = None
+
+                        continue
+
+                if end is not None and time > end:
+                    return
+
+                yield time, {ids[index]: to_str(index, value) for index, value in changes}
+
+        if start is not None and state is not None and (end is None or start <= end):
+            yield start, get_state()
+
+    def write_to(self, sink: WaveSink) -> None:
+        """Write all the changes to a sink and close it."""
+        sink.open(self.component_id, self.widths, self.time_unit)
+
+        for time, changes in self.iter_changes():
+            sink.write(time, changes)
+
+        sink.close(self.end_time)
+
+    def to_vcd(self, file_path: str | Path) -> None:
+        """Convert the waveform file to a VCD file."""
+        from .vcd import VcdWriter
+
+        self.write_to(VcdWriter(file_path))
@@ -0,0 +1,473 @@
+"""
+This module keeps the waves of a simulation in memory in a columnar layout, with the times and the
+values of the changes of each bus in arrays, so they are compact and can be exported to NumPy.
+
+The changes of each bus are sorted by time, so the value of a bus at a time and its changes in a
+time range are found by binary search.
+
+To bound the memory of long simulations, the changes can be spilled to a file. They are kept in
+memory until there are `chunk_size` of them, then they are moved to the file, that is read back
+through `mmap` when needed. The times and the values of each bus have a region of the file that
+grows by relocation, so each bus has a single spilled segment however long the simulation is.
+"""
+import mmap
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from itertools import chain, groupby, repeat
+from pathlib import Path
+from tempfile import TemporaryFile
+from typing import Any, BinaryIO, Iterator, Optional, Sequence
+
+from .backend.python.core.lanes import NUMPY_WIDTH, np, to_array
+from .sink import WaveSink
+from .vcd import VcdReader
+from .wavefile import WaveFileReader
+
+EDGES = ['any', 'rising', 'falling']
+# The default number of changes kept in memory when they are spilled to a file.
+CHUNK_SIZE = 1 << 20
+
+
+def is_high(value: int | str) -> bool:
+    """Check if a value has a bit set, the text values can have unknown bits."""
+    return '1' in value if isinstance(value, str) else value != 0
+
+
+class SpillFile:
+    """This class is a file with a growable region for the times and another for the values of
+    each spilled trace, mapped to memory.
+
+    When data doesn't fit in a region, the region is moved to the end of the file with twice the
+    capacity, so the file is at most a few times the size of the data and the appends are
+    amortized. The file is mapped again after each spill.
+    """
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.end = file.seek(0, 2)  # The end of the last region
+        self.view = memoryview(b'')
+
+    def append(self, region: Optional[list[int]], data: bytes) -> list[int]:
+        """Append data to a region, given as [offset, size, capacity], returning the region."""
+        file = self.file
+
+        if region is None:
+            region = [self.end, 0, 0]
+
+        offset, size, capacity = region
+
+        if size + len(data) > capacity:
+            file.seek(offset)
+            data = file.read(size) + data
+            # The regions are aligned to 8 bytes, like the times
+            capacity = max(2 * capacity, len(data) + (-len(data) % 8))
+            offset = self.end
+            size = 0
+            self.end += capacity
+
+        file.seek(offset + size)
+        file.write(data)
+
+        return [offset, size + len(data), capacity]
+
+    def remap(self) -> None:
+        """Map the file again, after it was written."""
+        self.file.flush()
+        # The previous map is released when the views of it are
+        self.view = memoryview(mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class PackedValues:
+    """This class is a read-only sequence of the values of a wide bus, packed in a buffer."""
+    def __init__(self, buffer: memoryview, n_bytes: int) -> None:
+        self.buffer = buffer
+        self.n_bytes = n_bytes
+
+    def __len__(self) -> int:
+        return len(self.buffer) // self.n_bytes
+
+    def __getitem__(self, key: int | slice) -> Any:
+        if isinstance(key, slice):
+            return [self[index] for index in range(*key.indices(len(self)))]
+
+        if key < 0:
+            key += len(self)
+
+        return int.from_bytes(self.buffer[key * self.n_bytes:(key + 1) * self.n_bytes], 'big')
+
+
+class Trace:
+    """This class has the changes of a bus, sorted by time.
+
+    The values are ints, with the first bit of the bus as the most significant one. They are stored
+    in an array of 64 bits ints, or in a list of Python ints for the wider buses. The changes
+    spilled to a file are read from their regions of it, as a single segment.
+
+    When a value isn't a binary string of the width of the bus, like the values of HLS buses or
+    the unknown bits of VCD files, the trace keeps all its values as strings from then on, in
+    memory.
+    """
+    def __init__(self, id: str, width: int) -> None:
+        self.id = id
+        self.width = width
+        self.n_bytes = (width + 7) // 8
+        self.times = array('q')
+        self.values: array | list[int] | list[str] = array('Q') if width <= NUMPY_WIDTH else []
+        self.spill_file: Optional[SpillFile] = None
+        # The regions of the spilled times and values in the file, as [offset, size, capacity]
+        self.times_region: Optional[list[int]] = None
+        self.values_region: Optional[list[int]] = None
+        self.n_spilled = 0
+        self.first_spilled = 0  # The time of the first spilled change
+        self.text = False  # If the values are kept as strings
+
+    def to_text(self) -> None:
+        """Keep the values as strings, moving the spilled ones back to memory."""
+        width = self.width
+        times = array('q')
+        values = []
+
+        for part_times, part_values in self.get_parts():
+            times.extend(part_times)
+            values += [format(value, f'0{width}b') if width else '' for value in part_values[:]]
+
+        self.times = times
+        self.values = values
+        self.times_region = None
+        self.values_region = None
+        self.n_spilled = 0
+        self.text = True
+
+    def __len__(self) -> int:
+        return self.n_spilled + len(self.times)
+
+    def __repr__(self) -> str:
+        return f'Trace {self.id}: {len(self)} changes'
+
+    def append(self, time: int, value: int | str) -> None:
+        """Add a change, replacing the last one if it is at the same time."""
+        if self.times and self.times[-1] == time:
+            self.values[-1] = value
+        else:
+            self.times.append(time)
+            self.values.append(value)
+
+    def get_spilled(self) -> tuple[Sequence[int], Sequence[int]]:
+        """Get the times and values of the spilled changes, read from the file."""
+        assert self.spill_file is not None
+        assert self.times_region is not None and self.values_region is not None
+        view = self.spill_file.view
+        offset, size, _ = self.times_region
+        times = view[offset:offset + size].cast('q')
+        offset, size, _ = self.values_region
+        values = view[offset:offset + size]
+
+        if self.width <= NUMPY_WIDTH:
+            return times, values.cast('Q')
+
+        return times, PackedValues(values, self.n_bytes)
+
+    def get_parts(self) -> list[tuple[Sequence[int], Sequence[int]]]:
+        """Get the times and values of the spilled changes and of the ones in memory, in order."""
+        parts = [self.get_spilled()] if self.n_spilled else []
+
+        if self.times:
+            parts.append((self.times, self.values))
+
+        return parts
+
+    def encode(self) -> tuple[bytes, bytes]:
+        """Get the times and values of the changes in memory as bytes, to spill them."""
+        if isinstance(self.values, array):
+            return self.times.tobytes(), self.values.tobytes()
+
+        return self.times.tobytes(), b''.join(
+            value.to_bytes(self.n_bytes, 'big') for value in self.values
+        )
+
+    def spill(self, spill_file: SpillFile) -> None:
+        """Move the changes in memory to the regions of the trace in the spill file."""
+        times, values = self.encode()
+
+        if not self.n_spilled:
+            self.first_spilled = self.times[0]
+
+        self.spill_file = spill_file
+        self.times_region = spill_file.append(self.times_region, times)
+        self.values_region = spill_file.append(self.values_region, values)
+        self.n_spilled += len(self.times)
+        self.times = array('q')
+        self.values = array('Q') if self.width <= NUMPY_WIDTH else []
+
+    def value_at(self, time: int) -> Optional[int | str]:
+        """Get the value at a time, or None if the bus has no changes until it."""
+        if self.times and self.times[0] <= time:
+            times, values = self.times, self.values
+        elif self.n_spilled and self.first_spilled <= time:
+            times, values = self.get_spilled()
+        else:
+            return None
+
+        return values[bisect_right(times, time) - 1]
+
+    def changes(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> list[tuple[int, int | str]]:
+        """Get the changes from the start to the end time, both included, as (time, value)."""
+        changes = []
+
+        for times, values in self.get_parts():
+            if (end is not None and times[0] > end) or (start is not None and times[-1] < start):
+                continue
+
+            first = 0 if start is None else bisect_left(times, start)
+            last = len(times) if end is None else bisect_right(times, end)
+            changes += zip(times[first:last], values[first:last])
+
+        return changes
+
+    def edges(
+        self, start: Optional[int] = None, end: Optional[int] = None, edge: str = 'any'
+    ) -> list[int]:
+        """
+        Get the times of the edges from the start to the end time, both included.
+
+        An edge is a change of the value, the first value of the bus isn't one. The edges can be
+        `'any'`, `'rising'` (to a nonzero value) or `'falling'` (to zero).
+        """
+        if edge not in EDGES:
+            raise ValueError(f'Invalid edge "{edge}". Valid edges are: {EDGES}')
+
+        changes = self.changes(start, end)
+
+        if not changes:
+            return []
+
+        # The times are ints, so the value before the first change is the one at the time before
+        previous = self.value_at(changes[0][0] - 1)
+        edges = []
+
+        for time, value in changes:
+            if previous is not None and value != previous:
+                if edge == 'any' or (edge == 'rising') == is_high(value):
+                    edges.append(time)
+
+            previous = value
+
+        return edges
+
+    def iter_changes(self) -> Iterator[tuple[int, int | str]]:
+        """Iterate over all the changes, as (time, value)."""
+        return chain.from_iterable(zip(times, values) for times, values in self.get_parts())
+
+    def to_numpy(self) -> tuple[Any, Any]:
+        """Get the times and the values of the changes as NumPy arrays."""
+        if np is None:
+            raise ImportError('NumPy is required to return arrays.')
+
+        parts = self.get_parts()
+        times = np.concatenate(
+            [np.frombuffer(times, dtype=np.int64) for times, _ in parts] or [np.zeros(0, np.int64)]
+        )
+
+        if self.text:
+            return times, np.array(self.values, dtype=object)
+
+        if self.width <= NUMPY_WIDTH:
+            return times, np.concatenate(
+                [np.frombuffer(values, dtype=np.uint64) for _, values in parts]
+                or [np.zeros(0, np.uint64)]
+            )
+
+        return times, to_array([value for _, values in parts for value in values[:]], self.width)
+
+
+class WaveStore(WaveSink):
+    """This class stores the value changes of a simulation, with a trace for each bus.
+
+    The traces are created when the first change of their bus is written, and the changes of a
+    bus at the same time are coalesced.
+    """
+    def __init__(self) -> None:
+        self.traces: dict[str, Trace] = {}
+        self.end_time: Optional[int] = None
+        self.time: Optional[int] = None  # The time of the last changes
+        self.spill_file: Optional[SpillFile] = None
+        self.spill_path: Optional[Path] = None
+        self.chunk_size = CHUNK_SIZE
+        self.n_buffered = 0  # The number of changes written since the last spill
+
+    def __len__(self) -> int:
+        return sum(len(trace) for trace in self.traces.values())
+
+    def __getitem__(self, id: str) -> Trace:
+        return self.traces[id]
+
+    @classmethod
+    def load(cls, file_path: str | Path) -> 'WaveStore':
+        """Load the waves of a VCD file or a binary waveform file, to query them."""
+        store = cls()
+        reader_class = VcdReader if Path(file_path).suffix.lower() == '.vcd' else WaveFileReader
+
+        with reader_class(file_path) as reader:
+            reader.write_to(store)
+
+        return store
+
+    def enable_spill(
+        self, file_path: Optional[str | Path] = None, chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        """
+        Spill the changes to a file when `chunk_size` of them are in memory.
+
+        The file is read through `mmap` and each bus has a single region of it for its times and
+        another for its values, so the memory used doesn't grow with the simulation and the
+        queries still see all the changes. If no path is given, it is a
+        temporary file, deleted when the store is cleared or released.
+        """
+        if chunk_size < 1:
+            raise ValueError(f'The size of the chunks must be positive, got {chunk_size}.')
+
+        self.spill_path = None if file_path is None else Path(file_path)
+        self.spill_file = SpillFile(
+            TemporaryFile() if file_path is None else open(file_path, 'w+b')
+        )
+        self.chunk_size = chunk_size
+
+    def spill(self) -> None:
+        """Move the changes in memory to the spill file and map it again."""
+        assert self.spill_file is not None
+        # The text traces are kept in memory
+        traces = [trace for trace in self.traces.values() if trace.times and not trace.text]
+
+        if not traces:
+            return
+
+        for trace in traces:
+            trace.spill(self.spill_file)
+
+        self.spill_file.remap()
+        self.n_buffered = 0
+
+    def open(self, component_id: str, widths: dict[str, int], time_unit: str) -> None:
+        for id, width in widths.items():
+            if id not in self.traces:
+                self.traces[id] = Trace(id, width)
+
+    def write(self, time: int, changes: dict[str, str]) -> None:
+        # The changes are spilled before a new time, so the ones of a time are coalesced
+        if self.spill_file is not None and self.n_buffered >= self.chunk_size and time != self.time:
+            self.spill()
+
+        traces = self.traces
+
+        for id, value in changes.items():
+            trace = traces.get(id)
+
+            if trace is None:
+                trace = traces[id] = Trace(id, len(value))
+
+            if not trace.text:
+                if len(value) == trace.width and not value.strip('01'):
+                    value = int(value, 2) if value else 0
+                else:
+                    trace.to_text()
+
+            trace.append(time, value)
+
+        self.time = time
+        self.n_buffered += len(changes)
+
+    def close(self, end_time: int) -> None:
+        self.end_time = end_time
+
+    def clear(self) -> None:
+        """Remove all the changes."""
+        self.traces = {}
+        self.end_time = None
+        self.time = None
+        self.n_buffered = 0
+
+        # A temporary file is replaced, the maps still in use are kept until they are released
+        if self.spill_file is not None and self.spill_path is None:
+            self.spill_file.file.close()
+            self.spill_file = SpillFile(TemporaryFile())
+
+    def value_at(self, id: str, time: int) -> Optional[int | str]:
+        """Get the value of a bus at a time, or None if it has no changes until it."""
+        return self.traces[id].value_at(time)
+
+    def values_at(self, time: int) -> dict[str, Optional[int | str]]:
+        """Get the values of all the buses at a time."""
+        return {id: trace.value_at(time) for id, trace in self.traces.items()}
+
+    def changes(
+        self, id: str, start: Optional[int] = None, end: Optional[int] = None
+    ) -> list[tuple[int, int | str]]:
+        """Get the changes of a bus from the start to the end time, both included."""
+        return self.traces[id].changes(start, end)
+
+    def edges(
+        self, id: str, start: Optional[int] = None, end: Optional[int] = None, edge: str = 'any'
+    ) -> list[int]:
+        """Get the times of the edges of a bus from the start to the end time, see `Trace.edges`."""
+        return self.traces[id].edges(start, end, edge)
+
+    def iter_changes(self) -> Iterator[tuple[int, dict[str, str]]]:
+        """Iterate over the changes of each time, in order of time and then of the traces."""
+        traces = list(self.traces.values())
+        changes = merge(*[
+            chain.from_iterable([
+                zip(times, repeat(index), values) for times, values in trace.get_parts()
+            ])
+            for index, trace in enumerate(traces)
+        ])
+
+        formats = [None if trace.text else f'0{trace.width}b' for trace in traces]
+
+        for time, group in groupby(changes, key=lambda change: change[0]):
+            yield time, {
+                traces[index].id: value if formats[index] is None else format(value, formats[index])
+                for _, index, value in group
+            }
+
+    def get_times(self) -> list[int]:
+        """Get the times with changes, in order."""
+        return sorted(set().union(*[
+            times for trace in self.traces.values() for times, _ in trace.get_parts()
+        ]))
+
+    def to_dict_of_arrays(self) -> dict[str, tuple[Any, Any]]:
+        """Get the times and the values of the changes of each bus as NumPy arrays."""
+        return {id: trace.to_numpy() for id, trace in self.traces.items()}
+
+    def to_numpy(self) -> Any:
+        """
+        Get the values of all the buses at each time with changes as a NumPy structured array.
+
+        The array has a row for each time, with the field `time` and a field for each bus, so the
+        values of a bus through the simulation are `table[id]`. The buses without changes until a
+        time have the value 0, and the values of the text traces are strings.
+        """
+        if np is None:
+            raise ImportError('NumPy is required to return arrays.')
+
+        times = np.array(self.get_times(), dtype=np.int64)
+        dtype = [('time', np.int64)] + [
+            (id, np.uint64 if trace.width <= NUMPY_WIDTH and not trace.text else object)
+            for id, trace in self.traces.items()
+        ]
+        table = np.zeros(len(times), dtype=dtype)
+        table['time'] = times
+
+        for id, trace in self.traces.items():
+            if not len(trace):
+                continue
+
+            trace_times, values = trace.to_numpy()
+            # The last change of the bus at or before each time
+            positions = np.searchsorted(trace_times, times, side='right') - 1
+            known = positions >= 0
+            table[id][known] = values[positions[known]]
+
+        return table
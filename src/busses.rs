@@ -12,7 +12,7 @@ pub trait BusValueTrait: VcdValue + Clone + Debug {
 }
 
 /// Implementação para valores de bit bus
-#[derive(Debug, Clone, PartialEq)]
+#[derive(Debug, Clone, PartialEq, Eq, Hash)]
 pub struct BitBusValue {
     pub raw_value: Vec<bool>,
 }
@@ -1,14 +1,30 @@
-use crate::busses::{BitBus, BitBusValue, BusTrait, BusValueTrait};
+use crate::busses::{BitBus, BitBusValue, BusTrait};
 use crate::expr_nodes::Evaluator;
-use std::collections::{HashMap, VecDeque};
+use crate::memo::Memo;
+use std::collections::{HashMap, HashSet, VecDeque};
 use std::fmt::{Display, Debug};
 
+/// Número padrão de vezes que cada bus pode ser avaliado em uma estabilização
+pub const MAX_ITERATIONS: usize = 100;
+
 /// Representa um componente no circuito
 #[derive(Debug, Clone)]
 pub struct Component {
     pub id: String,
     pub busses: HashMap<String, BitBus>,
     pub assignments: HashMap<String, Box<dyn Evaluator>>, // Separamos assignments para evitar problemas de thread safety
+    pub bus_ids: Vec<String>, // IDs dos buses na ordem de inserção (índices das influence lists)
+    pub bus_indices: HashMap<String, usize>,
+    pub ranks: Vec<usize>, // Rank topológico de cada bus no grafo de influência
+    pub depth: usize, // Número de ranks do grafo de influência
+    pub max_iterations: usize,
+    pub cyclic: bool, // Se o grafo de influência tem laços de realimentação
+    // Valores estáveis dos buses com atribuição para cada valor das entradas, quando habilitado
+    pub memo: Option<Memo>,
+    pub memo_inputs: Vec<String>,
+    pub memo_busses: Vec<String>,
+    pub recorded: Option<HashSet<String>>, // Buses gravados pelo test bench, todos quando None
+    pub dirty: bool, // Se um port mudou o componente sem que o test bench gravasse
 }
 
 impl Component {
@@ -17,6 +33,17 @@ impl Component {
             id,
             busses: HashMap::new(),
             assignments: HashMap::new(),
+            bus_ids: Vec::new(),
+            bus_indices: HashMap::new(),
+            ranks: Vec::new(),
+            depth: 0,
+            max_iterations: MAX_ITERATIONS,
+            cyclic: false,
+            memo: None,
+            memo_inputs: Vec::new(),
+            memo_busses: Vec::new(),
+            recorded: None,
+            dirty: false,
         }
     }
 
@@ -28,66 +55,404 @@ impl Component {
             .collect()
     }
 
-    /// Estabiliza os bits do componente
-    pub fn stabilize(&mut self) {
-        let mut queue: VecDeque<String> = self.busses.keys().cloned().collect();
+    /// Define os buses gravados pelo test bench, todos quando `ids` é None
+    pub fn set_recorded(&mut self, ids: Option<Vec<String>>) -> Result<(), String> {
+        if let Some(ids) = &ids {
+            if let Some(id) = ids.iter().find(|id| !self.busses.contains_key(*id)) {
+                return Err(format!("Bus '{}' not found", id));
+            }
+        }
+
+        self.recorded = ids.map(|ids| ids.into_iter().collect());
+        Ok(())
+    }
+
+    /// Verifica se um bus é gravado pelo test bench
+    pub fn is_recorded(&self, bus_id: &str) -> bool {
+        self.recorded.as_ref().map_or(true, |recorded| recorded.contains(bus_id))
+    }
+
+    /// Retorna os valores dos buses gravados, sem converter os outros
+    pub fn get_recorded_values(&self) -> HashMap<String, String> {
+        self.busses
+            .iter()
+            .filter(|(name, _)| self.is_recorded(name))
+            .map(|(name, bus)| (name.clone(), bus.value.to_string()))
+            .collect()
+    }
+
+    /// Retorna os IDs dos buses sem atribuição (as entradas), na ordem de inserção
+    pub fn get_inputs(&self) -> Vec<String> {
+        self.bus_ids
+            .iter()
+            .filter(|id| !self.assignments.contains_key(*id))
+            .cloned()
+            .collect()
+    }
+
+    /// Habilita a memoização da estabilização
+    ///
+    /// Os valores dos buses com atribuição de um componente combinacional dependem só das
+    /// entradas, então são guardados para cada valor das entradas e restaurados, em vez de
+    /// estabilizar o componente, quando as mesmas entradas se repetem.
+    pub fn enable_memo(&mut self, max_size: usize) -> Result<(), String> {
+        if self.cyclic {
+            return Err(
+                "Memoization requires a combinational component, without feedback loops.".to_string()
+            );
+        }
+
+        self.memo = Some(Memo::new(max_size)?);
+        self.memo_inputs = self.get_inputs();
+        self.memo_busses = self.bus_ids
+            .iter()
+            .filter(|id| self.assignments.contains_key(*id))
+            .cloned()
+            .collect();
+        Ok(())
+    }
+
+    /// Desabilita a memoização e descarta o cache
+    pub fn disable_memo(&mut self) {
+        self.memo = None;
+        self.memo_inputs.clear();
+        self.memo_busses.clear();
+    }
+
+    /// Estabiliza todos os buses do componente (usado uma vez, na renderização)
+    pub fn settle(&mut self) -> Result<(), String> {
+        let seed: Vec<usize> = (0..self.bus_ids.len()).collect();
+        self.stabilize(seed).map(|_| ())
+    }
+
+    /// Estabiliza os bits do componente a partir dos buses da semente
+    ///
+    /// Existe uma fila para cada rank e a fila do menor rank com buses pendentes é sempre
+    /// atendida primeiro, então um bus só é avaliado quando suas entradas já estabilizaram.
+    ///
+    /// Retorna os índices dos buses cujos valores mudaram.
+    pub fn stabilize(&mut self, seed: Vec<usize>) -> Result<Vec<usize>, String> {
+        // Valor anterior de cada bus avaliado que mudou. Um bus de um laço de realimentação pode
+        // voltar ao valor anterior, então os valores são comparados no final.
+        let mut changed: HashMap<usize, BitBusValue> = HashMap::new();
+        let mut levels: Vec<VecDeque<usize>> = vec![VecDeque::new(); self.depth];
+        let mut queued = vec![false; self.bus_ids.len()];
+
+        for idx in seed {
+            if !queued[idx] {
+                queued[idx] = true;
+                levels[self.ranks[idx]].push_back(idx);
+            }
+        }
 
-        while let Some(bus_id) = queue.pop_front() {
-            if let Some(assignment) = self.assignments.get(&bus_id) {
+        let mut budget = self.max_iterations * self.bus_ids.len();
+        let mut rank = 0;
+
+        while rank < self.depth {
+            let idx = match levels[rank].pop_front() {
+                Some(idx) => idx,
+                None => {
+                    rank += 1;
+                    continue;
+                }
+            };
+
+            if budget == 0 {
+                let pending: Vec<&String> = (0..self.bus_ids.len())
+                    .filter(|&i| queued[i] || i == idx)
+                    .map(|i| &self.bus_ids[i])
+                    .collect();
+
+                return Err(format!(
+                    "The buses {:?} did not stabilize after {} iterations.",
+                    pending, self.max_iterations
+                ));
+            }
+
+            budget -= 1;
+            queued[idx] = false;
+            let bus_id = &self.bus_ids[idx];
+
+            if let Some(assignment) = self.assignments.get(bus_id) {
                 // Avalia a expressão
                 let new_value = assignment.evaluate(&self.busses);
 
-                // Verifica se houve mudança
-                let previous_value = self.busses.get(&bus_id)
-                    .map(|bus| bus.value.clone())
-                    .unwrap_or_else(|| BitBusValue::get_default());
-
-                // Coleta os índices de influência antes da mutação
-                let influence_indices: Vec<usize> = self.busses.get(&bus_id)
-                    .map(|bus| bus.influence_list.clone())
-                    .unwrap_or_default();
-
-                // Atualiza o valor
-                if let Some(bus_mut) = self.busses.get_mut(&bus_id) {
-                    bus_mut.value = new_value.clone();
-
-                    // Se houve mudança, adiciona os buses influenciados à fila
-                    if previous_value != new_value {
-                        // Agora usa os índices coletados anteriormente
-                        for &influenced_idx in &influence_indices {
-                            // Convertemos o índice de volta para ID do bus
-                            if let Some((influenced_id, _)) = self.busses.iter().nth(influenced_idx) {
-                                let influenced_id = influenced_id.clone();
-                                if !queue.contains(&influenced_id) {
-                                    queue.push_back(influenced_id);
-                                }
+                if let Some(bus) = self.busses.get_mut(bus_id) {
+                    // Se houve mudança, adiciona os buses influenciados às filas
+                    if bus.value != new_value {
+                        let previous_value = std::mem::replace(&mut bus.value, new_value);
+                        changed.entry(idx).or_insert(previous_value);
+
+                        for &influenced_idx in &bus.influence_list {
+                            if !queued[influenced_idx] {
+                                queued[influenced_idx] = true;
+                                let influenced_rank = self.ranks[influenced_idx];
+                                levels[influenced_rank].push_back(influenced_idx);
+                                rank = rank.min(influenced_rank);
                             }
                         }
                     }
                 }
             }
         }
-    }    /// Atualiza os sinais com novos valores e estabiliza
-    pub fn update_signals(&mut self, new_values: HashMap<String, String>) -> Result<(), String> {
+
+        let mut changed: Vec<usize> = changed
+            .into_iter()
+            .filter(|(idx, previous_value)| self.busses[&self.bus_ids[*idx]].value != *previous_value)
+            .map(|(idx, _)| idx)
+            .collect();
+        changed.sort_unstable();
+        Ok(changed)
+    }
+
+    /// Verifica se um bus pode ser escrito pelo test bench
+    fn check_writable(&self, id: &str) -> Result<(), String> {
+        if self.memo.is_some() && self.assignments.contains_key(id) {
+            return Err(format!(
+                "The bus \"{}\" is assigned, only inputs can be updated with memoization.",
+                id
+            ));
+        }
+        Ok(())
+    }
+
+    /// Estabiliza o componente depois da escrita de alguns buses
+    ///
+    /// A semente tem os buses influenciados pelos buses escritos que mudaram. Com a memoização
+    /// habilitada, os valores estáveis são restaurados do cache se as entradas já foram vistas.
+    /// Retorna os índices dos buses cujos valores mudaram.
+    pub fn propagate(&mut self, seed: Vec<usize>) -> Result<Vec<usize>, String> {
+        if self.memo.is_none() || seed.is_empty() {
+            // Estabiliza o circuito
+            return self.stabilize(seed);
+        }
+
+        let key: Vec<BitBusValue> = self.memo_inputs
+            .iter()
+            .map(|id| self.busses[id].value.clone())
+            .collect();
+
+        if let Some(values) = self.memo.as_mut().unwrap().get(&key) {
+            // Acerto: restaura os valores estáveis sem estabilizar
+            let mut changed = Vec::new();
+
+            for (id, value) in self.memo_busses.iter().zip(values) {
+                if let Some(bus) = self.busses.get_mut(id) {
+                    if bus.value != *value {
+                        bus.value = value.clone();
+                        changed.push(self.bus_indices[id]);
+                    }
+                }
+            }
+
+            return Ok(changed);
+        }
+
+        let changed = self.stabilize(seed)?;
+
+        let values: Vec<BitBusValue> = self.memo_busses
+            .iter()
+            .map(|id| self.busses[id].value.clone())
+            .collect();
+        self.memo.as_mut().unwrap().put(key, values);
+        Ok(changed)
+    }
+
+    /// Atualiza os sinais com novos valores e estabiliza
+    ///
+    /// Retorna os IDs dos buses cujos valores mudaram, escritos ou estabilizados.
+    pub fn update_signals(&mut self, new_values: HashMap<String, String>) -> Result<Vec<String>, String> {
+        let mut seed: Vec<usize> = Vec::new();
+        let mut written: Vec<String> = Vec::new();
+
         // Atualiza os valores
         for (id, new_value) in new_values {
+            self.check_writable(&id)?;
+
             if let Some(bus) = self.busses.get_mut(&id) {
+                let previous_value = bus.value.clone();
                 bus.insert_value(&new_value)?;
+
+                // Só os buses influenciados por valores que mudaram são estabilizados
+                if bus.value != previous_value {
+                    seed.extend(bus.influence_list.iter().copied());
+                    written.push(id);
+                }
             }
         }
 
-        // Estabiliza o circuito
-        self.stabilize();
+        self.finish_update(seed, written)
+    }
 
-        Ok(())
+    /// Escreve os valores de vários buses e estabiliza uma vez, como `update_signals` sem strings
+    pub fn update_bits(&mut self, new_values: Vec<(&str, BitBusValue)>) -> Result<Vec<String>, String> {
+        let mut seed: Vec<usize> = Vec::new();
+        let mut written: Vec<String> = Vec::new();
+
+        for (id, value) in new_values {
+            self.check_writable(id)?;
+
+            let bus = self.busses
+                .get_mut(id)
+                .ok_or_else(|| format!("Bus '{}' not found", id))?;
+
+            if bus.value.raw_value.len() != value.raw_value.len() {
+                return Err(format!(
+                    "Invalid value for \"{}\". The value must have {} bits.",
+                    id,
+                    bus.value.raw_value.len()
+                ));
+            }
+
+            if bus.value != value {
+                bus.value = value;
+                seed.extend(bus.influence_list.iter().copied());
+                written.push(id.to_string());
+            }
+        }
+
+        self.finish_update(seed, written)
+    }
+
+    /// Estabiliza após a escrita de buses, retornando os IDs dos escritos e dos estabilizados que
+    /// mudaram
+    fn finish_update(&mut self, seed: Vec<usize>, mut written: Vec<String>) -> Result<Vec<String>, String> {
+        for idx in self.propagate(seed)? {
+            let id = &self.bus_ids[idx];
+
+            if !written.contains(id) {
+                written.push(id.clone());
+            }
+        }
+
+        Ok(written)
+    }
+
+    /// Escreve os bits de um bus e estabiliza, sem passar por strings
+    pub fn write_bits(&mut self, id: &str, raw_value: Vec<bool>) -> Result<(), String> {
+        self.check_writable(id)?;
+
+        let bus = self.busses
+            .get_mut(id)
+            .ok_or_else(|| format!("Bus '{}' not found", id))?;
+
+        if bus.value.raw_value == raw_value {
+            return Ok(());
+        }
+
+        bus.value = BitBusValue { raw_value };
+        let seed = bus.influence_list.clone();
+        self.dirty = true;
+        self.propagate(seed).map(|_| ())
+    }
+
+    /// Retorna os bits de um bus
+    pub fn read_bits(&self, id: &str) -> Result<&Vec<bool>, String> {
+        self.busses
+            .get(id)
+            .map(|bus| &bus.value.raw_value)
+            .ok_or_else(|| format!("Bus '{}' not found", id))
+    }
+
+    /// Escreve um inteiro em um bus (o primeiro bit é o mais significativo) e estabiliza
+    pub fn write_int(&mut self, id: &str, value: u128) -> Result<(), String> {
+        let width = self.read_bits(id)?.len();
+
+        if width > 128 {
+            return Err(format!("The bus \"{}\" has more than 128 bits, write bytes instead.", id));
+        }
+
+        if width < 128 && value >> width != 0 {
+            return Err(format!(
+                "Invalid value \"{}\" for \"{}\". The value must have {} bits.", value, id, width
+            ));
+        }
+
+        let raw_value = (0..width).map(|i| (value >> (width - 1 - i)) & 1 == 1).collect();
+        self.write_bits(id, raw_value)
+    }
+
+    /// Lê um bus como inteiro (o primeiro bit é o mais significativo)
+    pub fn read_int(&self, id: &str) -> Result<u128, String> {
+        let raw_value = self.read_bits(id)?;
+
+        if raw_value.len() > 128 {
+            return Err(format!("The bus \"{}\" has more than 128 bits, read bytes instead.", id));
+        }
+
+        Ok(raw_value.iter().fold(0, |value, &bit| (value << 1) | bit as u128))
+    }
+
+    /// Escreve bytes big endian em um bus e estabiliza
+    pub fn write_bytes(&mut self, id: &str, data: &[u8]) -> Result<(), String> {
+        let width = self.read_bits(id)?.len();
+        let n_bytes = (width + 7) / 8;
+
+        if data.len() != n_bytes {
+            return Err(format!(
+                "Invalid value {:?} for \"{}\". The value must have {} bytes.", data, id, n_bytes
+            ));
+        }
+
+        // Os bits que sobram no primeiro byte devem ser zero
+        if n_bytes > 0 && (data[0] as u16) >> (width - (n_bytes - 1) * 8) != 0 {
+            return Err(format!(
+                "Invalid value {:?} for \"{}\". The value must have {} bits.", data, id, width
+            ));
+        }
+
+        let raw_value = (0..width)
+            .map(|i| {
+                let shift = width - 1 - i;
+                (data[n_bytes - 1 - shift / 8] >> (shift % 8)) & 1 == 1
+            })
+            .collect();
+        self.write_bits(id, raw_value)
+    }
+
+    /// Lê um bus como bytes big endian
+    pub fn read_bytes(&self, id: &str) -> Result<Vec<u8>, String> {
+        let raw_value = self.read_bits(id)?;
+        let width = raw_value.len();
+        let n_bytes = (width + 7) / 8;
+        let mut data = vec![0u8; n_bytes];
+
+        for (i, &bit) in raw_value.iter().enumerate() {
+            let shift = width - 1 - i;
+
+            if bit {
+                data[n_bytes - 1 - shift / 8] |= 1 << (shift % 8);
+            }
+        }
+
+        Ok(data)
     }
 
     /// Adiciona um bus ao componente
     pub fn add_bus(&mut self, id: String, mut bus: BitBus) {
         bus.set_id(id.clone());
+
+        if !self.bus_indices.contains_key(&id) {
+            self.bus_indices.insert(id.clone(), self.bus_ids.len());
+            self.bus_ids.push(id.clone());
+            self.ranks.push(0);
+            self.depth = self.depth.max(1);
+        }
+
         self.busses.insert(id, bus);
     }
 
+    /// Define o rank topológico de um bus
+    pub fn set_rank(&mut self, bus_id: &str, rank: usize) -> Result<(), String> {
+        let idx = *self.bus_indices
+            .get(bus_id)
+            .ok_or_else(|| format!("Bus '{}' not found", bus_id))?;
+
+        self.ranks[idx] = rank;
+        self.depth = self.depth.max(rank + 1);
+        Ok(())
+    }
+
     /// Define uma atribuição para um bus
     pub fn set_assignment(&mut self, bus_id: String, assignment: Box<dyn Evaluator>) {
         self.assignments.insert(bus_id, assignment);
@@ -96,11 +461,8 @@ impl Component {
     /// Adiciona um bus à lista de influência de outro bus
     pub fn add_influence(&mut self, influencer_id: &str, influenced_id: &str) -> Result<(), String> {
         // Encontra o índice do bus influenciado
-        let influenced_idx = self.busses
-            .keys()
-            .enumerate()
-            .find(|(_, id)| *id == influenced_id)
-            .map(|(idx, _)| idx)
+        let influenced_idx = *self.bus_indices
+            .get(influenced_id)
             .ok_or_else(|| format!("Bus '{}' not found", influenced_id))?;
 
         // Adiciona o índice à lista de influência do bus influenciador
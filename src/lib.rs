@@ -1,5 +1,6 @@
 use pyo3::prelude::*;
 use pyo3::exceptions::PyRuntimeError;
+use pyo3::types::PyBytes;
 use std::collections::HashMap;
 use std::sync::Mutex;
 
@@ -8,6 +9,8 @@ pub mod busses;
 pub mod expr_nodes;
 pub mod component;
 pub mod renderer;
+pub mod memo;
+pub mod stimulus;
 
 // Re-exports para facilitar o uso
 use component::Component as RustComponent;
@@ -70,9 +73,13 @@ pub struct Component {
 #[pymethods]
 impl Component {
     /// Atualiza sinais com novos valores e estabiliza
-    fn update_signals(&self, new_values: HashMap<String, String>) -> PyResult<()> {
-        with_component(self.handle, |comp| {
-            comp.update_signals(new_values)
+    ///
+    /// O GIL é liberado durante a estabilização, então outras threads Python (como a que grava
+    /// as mudanças) rodam ao mesmo tempo.
+    fn update_signals(&self, py: Python<'_>, new_values: HashMap<String, String>) -> PyResult<()> {
+        let handle = self.handle;
+        py.allow_threads(|| {
+            with_component(handle, |comp| comp.update_signals(new_values).map(|_| ()))
         })
         .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
         .map_err(|e| PyRuntimeError::new_err(e))
@@ -84,17 +91,107 @@ impl Component {
             .ok_or_else(|| PyRuntimeError::new_err("Component not found"))
     }
 
+    /// Retorna os IDs dos buses sem atribuição (as entradas)
+    fn get_inputs(&self) -> PyResult<Vec<String>> {
+        with_component(self.handle, |comp| comp.get_inputs())
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))
+    }
+
+    /// Habilita a memoização da estabilização, com um cache LRU de `max_size` entradas
+    #[pyo3(signature = (max_size=memo::MEMO_SIZE))]
+    fn enable_memo(&self, max_size: usize) -> PyResult<()> {
+        with_component(self.handle, |comp| comp.enable_memo(max_size))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .map_err(|e| PyRuntimeError::new_err(e))
+    }
+
+    /// Desabilita a memoização e descarta o cache
+    fn disable_memo(&self) -> PyResult<()> {
+        with_component(self.handle, |comp| comp.disable_memo())
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))
+    }
+
+    /// Retorna as estatísticas do cache de memoização
+    fn memo_stats(&self) -> PyResult<HashMap<String, u64>> {
+        with_component(self.handle, |comp| comp.memo.as_ref().map(|memo| memo.stats()))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .ok_or_else(|| PyRuntimeError::new_err("Memoization is not enabled."))
+    }
+
+    /// Retorna um handle para ler e escrever um bus como inteiro
+    fn port(&self, id: String) -> PyResult<Port> {
+        let width = with_component(self.handle, |comp| comp.read_bits(&id).map(|bits| bits.len()))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .map_err(|e| PyRuntimeError::new_err(e))?;
+
+        Ok(Port { handle: self.handle, id, width })
+    }
+
+    /// Retorna se um port mudou o componente desde a última chamada, limpando o indicador
+    fn take_dirty(&self) -> PyResult<bool> {
+        with_component(self.handle, |comp| std::mem::replace(&mut comp.dirty, false))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))
+    }
+
     /// Atualiza e retorna valores em uma chamada
-    fn update_and_get(&self, new_values: HashMap<String, String>) -> PyResult<HashMap<String, String>> {
-        with_component(self.handle, |comp| {
-            let result = comp.update_signals(new_values);
-            (result, comp.get_values())
-        })
-        .ok_or_else(|| PyRuntimeError::new_err("Component not found"))
-        .and_then(|(result, values)| {
-            result.map_err(|e| PyRuntimeError::new_err(e))?;
-            Ok(values)
+    ///
+    /// Com `changes_only`, retorna só os valores dos buses que mudaram. Com `recorded_only`,
+    /// retorna só os buses gravados (veja `set_recorded`). O GIL é liberado durante a
+    /// estabilização, como em `update_signals`.
+    #[pyo3(signature = (new_values, changes_only=false, recorded_only=false))]
+    fn update_and_get(
+        &self,
+        py: Python<'_>,
+        new_values: HashMap<String, String>,
+        changes_only: bool,
+        recorded_only: bool,
+    ) -> PyResult<HashMap<String, String>> {
+        let handle = self.handle;
+        py.allow_threads(|| {
+            with_component(handle, |comp| {
+                comp.update_signals(new_values).map(|changed| {
+                    if changes_only {
+                        changed
+                            .into_iter()
+                            .filter(|id| !recorded_only || comp.is_recorded(id))
+                            .filter_map(|id| comp.get_bus_value(&id).map(|value| (id, value)))
+                            .collect()
+                    } else if recorded_only {
+                        comp.get_recorded_values()
+                    } else {
+                        comp.get_values()
+                    }
+                })
+            })
         })
+        .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+        .map_err(|e| PyRuntimeError::new_err(e))
+    }
+
+    /// Define os buses gravados pelo test bench, todos quando `ids` é None
+    #[pyo3(signature = (ids=None))]
+    fn set_recorded(&self, ids: Option<Vec<String>>) -> PyResult<()> {
+        with_component(self.handle, |comp| comp.set_recorded(ids))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .map_err(|e| PyRuntimeError::new_err(e))
+    }
+
+    /// Abre um arquivo de estímulo para reproduzir no componente, sem voltar ao Python por linha
+    ///
+    /// Com `record`, o reprodutor retorna a espera e as mudanças de cada linha em blocos (veja
+    /// `update_and_get`), para que a memória usada não cresça com o tamanho do arquivo.
+    #[pyo3(signature = (path, record=true, changes_only=false, recorded_only=false))]
+    fn open_stimulus(
+        &self,
+        path: String,
+        record: bool,
+        changes_only: bool,
+        recorded_only: bool,
+    ) -> PyResult<StimulusPlayer> {
+        let player = stimulus::Player::open(&path, record, changes_only, recorded_only)
+            .map_err(|e| PyRuntimeError::new_err(e))?;
+
+        Ok(StimulusPlayer { handle: self.handle, player })
     }
 
     /// Propriedade busses - retorna Dict[str, str] com valores
@@ -103,6 +200,13 @@ impl Component {
         self.get_values()
     }
 
+    /// Propriedade cyclic - se o grafo de influência tem laços de realimentação
+    #[getter]
+    fn get_cyclic(&self) -> PyResult<bool> {
+        with_component(self.handle, |comp| comp.cyclic)
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))
+    }
+
     /// Propriedade id_
     #[getter]
     fn get_id_(&self) -> String {
@@ -120,6 +224,96 @@ impl Component {
     }
 }
 
+/// Reprodução de um arquivo de estímulo em um componente, que retorna as mudanças em blocos
+#[pyclass]
+pub struct StimulusPlayer {
+    handle: u64,
+    player: stimulus::Player,
+}
+
+#[pymethods]
+impl StimulusPlayer {
+    /// Reproduz as próximas `max_rows` linhas, retornando a espera e as mudanças de cada uma
+    ///
+    /// Sem `record`, reproduz o arquivo inteiro. Retorna uma lista vazia no fim do arquivo. O GIL
+    /// é liberado durante a reprodução.
+    #[pyo3(signature = (max_rows=1024))]
+    fn play(
+        &mut self,
+        py: Python<'_>,
+        max_rows: usize,
+    ) -> PyResult<Vec<(u64, HashMap<String, String>)>> {
+        let handle = self.handle;
+        let player = &mut self.player;
+        py.allow_threads(|| with_component(handle, |comp| player.play(comp, max_rows)))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .map_err(|e| PyRuntimeError::new_err(e))
+    }
+
+    /// Número de linhas reproduzidas
+    #[getter]
+    fn n_rows(&self) -> usize {
+        self.player.n_rows
+    }
+
+    /// Soma das esperas das linhas reproduzidas
+    #[getter]
+    fn total_delay(&self) -> u64 {
+        self.player.total_delay
+    }
+}
+
+/// Handle para um bus de um componente, lido e escrito como inteiro sem passar por strings
+#[pyclass]
+pub struct Port {
+    handle: u64,
+    #[pyo3(get)]
+    id: String,
+    #[pyo3(get)]
+    width: usize,
+}
+
+#[pymethods]
+impl Port {
+    /// Escreve um inteiro no bus e estabiliza
+    fn write(&self, value: u128) -> PyResult<()> {
+        with_component(self.handle, |comp| comp.write_int(&self.id, value))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .map_err(|e| PyRuntimeError::new_err(e))
+    }
+
+    /// Lê o bus como inteiro
+    fn read(&self) -> PyResult<u128> {
+        with_component(self.handle, |comp| comp.read_int(&self.id))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .map_err(|e| PyRuntimeError::new_err(e))
+    }
+
+    /// Escreve bytes big endian no bus e estabiliza
+    fn write_bytes(&self, data: &[u8]) -> PyResult<()> {
+        with_component(self.handle, |comp| comp.write_bytes(&self.id, data))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .map_err(|e| PyRuntimeError::new_err(e))
+    }
+
+    /// Lê o bus como bytes big endian
+    fn read_bytes<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        let data = with_component(self.handle, |comp| comp.read_bytes(&self.id))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .map_err(|e| PyRuntimeError::new_err(e))?;
+
+        Ok(PyBytes::new(py, &data))
+    }
+
+    fn __repr__(&self) -> PyResult<String> {
+        let value = with_component(self.handle, |comp| comp.get_bus_value(&self.id))
+            .ok_or_else(|| PyRuntimeError::new_err("Component not found"))?
+            .unwrap_or_default();
+
+        Ok(format!("Port {}: {}", self.id, value))
+    }
+}
+
 /// Wrapper PyClass para Renderer
 #[pyclass(unsendable)]
 pub struct Renderer {
@@ -167,6 +361,8 @@ impl Renderer {
 fn core(_py: Python<'_>, m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<Component>()?;
     m.add_class::<Renderer>()?;
+    m.add_class::<Port>()?;
+    m.add_class::<StimulusPlayer>()?;
     m.add("__version__", "0.5.0")?;
     Ok(())
 }
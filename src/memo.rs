@@ -0,0 +1,91 @@
+use crate::busses::BitBusValue;
+use std::collections::{BTreeMap, HashMap};
+
+/// Número padrão de entradas do cache
+pub const MEMO_SIZE: usize = 4096;
+
+/// Cache LRU (menos recentemente usado) com estatísticas de acertos e falhas
+///
+/// Cada entrada guarda o instante do último uso, e `order` ordena as chaves por esse instante,
+/// então a entrada menos recentemente usada é sempre a primeira de `order`.
+#[derive(Debug, Clone)]
+pub struct Memo {
+    pub max_size: usize,
+    entries: HashMap<Vec<BitBusValue>, (u64, Vec<BitBusValue>)>,
+    order: BTreeMap<u64, Vec<BitBusValue>>,
+    tick: u64,
+    pub hits: u64,
+    pub misses: u64,
+    pub evictions: u64,
+}
+
+impl Memo {
+    pub fn new(max_size: usize) -> Result<Self, String> {
+        if max_size == 0 {
+            return Err(format!("The size of the cache must be positive, got {}.", max_size));
+        }
+
+        Ok(Memo {
+            max_size,
+            entries: HashMap::new(),
+            order: BTreeMap::new(),
+            tick: 0,
+            hits: 0,
+            misses: 0,
+            evictions: 0,
+        })
+    }
+
+    pub fn len(&self) -> usize {
+        self.entries.len()
+    }
+
+    /// Obtém a entrada de uma chave, marcando-a como a mais recentemente usada
+    pub fn get(&mut self, key: &Vec<BitBusValue>) -> Option<&Vec<BitBusValue>> {
+        self.tick += 1;
+
+        match self.entries.get_mut(key) {
+            Some((last_use, values)) => {
+                self.hits += 1;
+                let key = self.order.remove(last_use).unwrap();
+                self.order.insert(self.tick, key);
+                *last_use = self.tick;
+                Some(values)
+            }
+            None => {
+                self.misses += 1;
+                None
+            }
+        }
+    }
+
+    /// Guarda a entrada de uma chave, removendo a menos recentemente usada se o cache estiver cheio
+    pub fn put(&mut self, key: Vec<BitBusValue>, values: Vec<BitBusValue>) {
+        self.tick += 1;
+
+        if let Some((last_use, _)) = self.entries.remove(&key) {
+            self.order.remove(&last_use);
+        }
+
+        self.order.insert(self.tick, key.clone());
+        self.entries.insert(key, (self.tick, values));
+
+        if self.entries.len() > self.max_size {
+            if let Some((_, oldest)) = self.order.pop_first() {
+                self.entries.remove(&oldest);
+                self.evictions += 1;
+            }
+        }
+    }
+
+    /// Retorna as estatísticas do cache
+    pub fn stats(&self) -> HashMap<String, u64> {
+        HashMap::from([
+            ("hits".to_string(), self.hits),
+            ("misses".to_string(), self.misses),
+            ("evictions".to_string(), self.evictions),
+            ("size".to_string(), self.len() as u64),
+            ("max_size".to_string(), self.max_size as u64),
+        ])
+    }
+}
@@ -178,6 +178,15 @@ impl Renderer {
 
             self.buffer_bus_dict.insert(bus_id.to_string(), bit_bus.clone());
             component.add_bus(bus_id.to_string(), bit_bus);
+
+            // Define o rank topológico calculado pelo frontend
+            let rank = j_bus.get("rank").and_then(|v| v.as_u64()).unwrap_or(0) as usize;
+            component.set_rank(bus_id, rank)?;
+
+            // Buses em laços de realimentação têm o índice do seu componente fortemente conexo
+            if j_bus.get("scc").map_or(false, |v| !v.is_null()) {
+                component.cyclic = true;
+            }
         }
 
         // Segunda passada: definir assignments e influence lists
@@ -205,6 +214,9 @@ impl Renderer {
             }
         }
 
+        // Estabiliza os valores iniciais dos buses
+        component.settle()?;
+
         Ok(component)
     }
 
@@ -0,0 +1,181 @@
+use crate::busses::BitBusValue;
+use crate::component::Component;
+use serde_json::Value;
+use std::collections::HashMap;
+use std::fs::File;
+use std::io::{BufReader, ErrorKind, Read};
+
+// Formato dos arquivos de estímulo, o mesmo de flote/stimulus.py
+const MAGIC: &[u8; 4] = b"FLST";
+const FORMAT_VERSION: u8 = 1;
+const HAS_DELAYS: u8 = 1;
+const HEADER_SIZE: usize = 12; // Magic, versão, flags, reservado e tamanho dos metadados
+const DELAY_SIZE: usize = 8;
+
+/// Lê o cabeçalho, retornando as entradas (ID, largura e deslocamento), os bytes das linhas e se
+/// as linhas têm esperas
+fn read_header<R: Read>(reader: &mut R) -> Result<(Vec<(String, usize, usize)>, usize, bool), String> {
+    let mut header = [0u8; HEADER_SIZE];
+    reader.read_exact(&mut header).map_err(|e| e.to_string())?;
+
+    if &header[0..4] != MAGIC {
+        return Err("The file is not a Flote stimulus file.".to_string());
+    }
+
+    if header[4] != FORMAT_VERSION {
+        return Err(format!("Unsupported stimulus file version {}.", header[4]));
+    }
+
+    let metadata_size = u32::from_le_bytes([header[8], header[9], header[10], header[11]]) as usize;
+    let mut metadata = vec![0u8; metadata_size];
+    reader.read_exact(&mut metadata).map_err(|e| e.to_string())?;
+    let metadata: Value = serde_json::from_slice(&metadata).map_err(|e| e.to_string())?;
+
+    let invalid = || "Invalid stimulus file metadata.".to_string();
+    let inputs = metadata["inputs"]
+        .as_array()
+        .ok_or_else(invalid)?
+        .iter()
+        .map(|input| {
+            Some((
+                input[0].as_str()?.to_string(),
+                input[1].as_u64()? as usize,
+                input[2].as_u64()? as usize,
+            ))
+        })
+        .collect::<Option<Vec<_>>>()
+        .ok_or_else(invalid)?;
+    let row_bytes = metadata["row_bytes"].as_u64().ok_or_else(invalid)? as usize;
+
+    Ok((inputs, row_bytes, header[5] & HAS_DELAYS != 0))
+}
+
+/// Reprodução de um arquivo de estímulo em blocos de linhas, para que as mudanças gravadas não
+/// fiquem todas na memória
+pub struct Player {
+    reader: BufReader<File>,
+    inputs: Vec<(String, usize, usize)>, // ID, largura e deslocamento de cada entrada
+    row: Vec<u8>,
+    has_delays: bool,
+    record: bool,
+    recorded_only: bool,
+    full: bool, // Se a próxima linha gravada tem os valores de todos os buses
+    done: bool,
+    pub n_rows: usize,
+    pub total_delay: u64, // Soma das esperas das linhas reproduzidas
+}
+
+impl Player {
+    /// Abre um arquivo de estímulo
+    ///
+    /// Com `record`, as mudanças de cada linha são retornadas, com os valores de todos os buses
+    /// na primeira quando `changes_only` é falso e só os buses gravados com `recorded_only`.
+    pub fn open(
+        path: &str,
+        record: bool,
+        changes_only: bool,
+        recorded_only: bool,
+    ) -> Result<Player, String> {
+        let file = File::open(path).map_err(|e| format!("{}: {}", path, e))?;
+        let mut reader = BufReader::new(file);
+        let (inputs, row_bytes, has_delays) = read_header(&mut reader)?;
+        let row_size = row_bytes + if has_delays { DELAY_SIZE } else { 0 };
+        let row_bits = row_bytes
+            .checked_mul(8)
+            .ok_or_else(|| "Invalid stimulus file metadata.".to_string())?;
+
+        // Os bits de cada entrada precisam estar dentro das linhas
+        for (id, width, offset) in &inputs {
+            if offset.checked_add(*width).map_or(true, |end| end > row_bits) {
+                return Err(format!(
+                    "The input \"{}\" is outside the rows of the stimulus file.",
+                    id
+                ));
+            }
+        }
+
+        Ok(Player {
+            reader,
+            inputs,
+            row: vec![0u8; row_size],
+            has_delays,
+            record,
+            recorded_only,
+            full: !changes_only,
+            done: row_size == 0, // Sem entradas nem esperas, o arquivo não tem linhas
+            n_rows: 0,
+            total_delay: 0,
+        })
+    }
+
+    /// Reproduz as próximas `max_rows` linhas em um componente, retornando a espera e as
+    /// mudanças de cada uma
+    ///
+    /// Sem `record`, reproduz todas as linhas restantes. Retorna uma lista vazia no fim do
+    /// arquivo.
+    pub fn play(
+        &mut self,
+        component: &mut Component,
+        max_rows: usize,
+    ) -> Result<Vec<(u64, HashMap<String, String>)>, String> {
+        let mut rows = Vec::new();
+
+        while !self.done && (!self.record || rows.len() < max_rows) {
+            match self.reader.read_exact(&mut self.row) {
+                Ok(()) => {}
+                Err(e) if e.kind() == ErrorKind::UnexpectedEof => {
+                    self.done = true;
+                    break;
+                }
+                Err(e) => return Err(e.to_string()),
+            }
+
+            let (delay, bits) = if self.has_delays {
+                let mut delay = [0u8; DELAY_SIZE];
+                delay.copy_from_slice(&self.row[..DELAY_SIZE]);
+                (u64::from_le_bytes(delay), &self.row[DELAY_SIZE..])
+            } else {
+                (0, &self.row[..])
+            };
+
+            // O primeiro bit de cada entrada é o mais significativo do primeiro byte
+            let new_values = self
+                .inputs
+                .iter()
+                .map(|(id, width, offset)| {
+                    let raw_value = (*offset..offset + width)
+                        .map(|bit| (bits[bit / 8] >> (7 - bit % 8)) & 1 == 1)
+                        .collect();
+                    (id.as_str(), BitBusValue { raw_value })
+                })
+                .collect();
+
+            let changed = component.update_bits(new_values)?;
+            self.n_rows += 1;
+            self.total_delay += delay;
+
+            if self.record {
+                let recorded_only = self.recorded_only;
+                let changes = if self.full {
+                    self.full = false;
+
+                    if recorded_only {
+                        component.get_recorded_values()
+                    } else {
+                        component.get_values()
+                    }
+                } else {
+                    changed
+                        .into_iter()
+                        .filter(|id| !recorded_only || component.is_recorded(id))
+                        .filter_map(|id| component.get_bus_value(&id).map(|value| (id, value)))
+                        .collect()
+                };
+
+                rows.push((delay, changes));
+            }
+        }
+
+        Ok(rows)
+    }
+}
@@ -0,0 +1,41 @@
+"""
+Benchmark of the batch simulation of the Python backend against one update per stimulus.
+
+Random stimuli go through the full adder, first with `TestBench.run_batch` (one stimulus in each
+bit lane) and then one `update_signals` call at a time.
+"""
+from pathlib import Path
+from random import Random
+from time import perf_counter
+
+import flote as ft
+
+BASE_DIR = Path(__file__).parent.parent.parent
+TESTS_DIR = BASE_DIR / 'tests'
+SIZES = [1_000, 10_000, 100_000]
+INPUTS = ['a', 'b', 'cin']
+
+
+def bench(n_stimuli: int) -> None:
+    rng = Random(n_stimuli)
+    test_bench = ft.elaborate_file(TESTS_DIR / 'duts' / 'FullAdder.ft', rust_backend=False)
+    stimuli = {id: [rng.getrandbits(1) for _ in range(n_stimuli)] for id in INPUTS}
+
+    start = perf_counter()
+    test_bench.run_batch(stimuli)
+    batch_time = perf_counter() - start
+
+    start = perf_counter()
+    for i in range(n_stimuli):
+        test_bench.component.update_signals({id: str(stimuli[id][i]) for id in INPUTS})
+    update_time = perf_counter() - start
+
+    print(
+        f'{n_stimuli:>8} stimuli | batch {batch_time * 1e3:9.3f} ms | '
+        f'updates {update_time * 1e3:9.3f} ms | speedup {update_time / batch_time:6.1f}x'
+    )
+
+
+if __name__ == '__main__':
+    for size in SIZES:
+        bench(size)
@@ -0,0 +1,63 @@
+"""
+Benchmark of the Python backend stabilization on large flattened designs.
+
+The generated design has independent chains of buses, each one driven by a bit of a wide input.
+Every update flips a single input bit, so only one chain should be evaluated. The full settle of
+the component (every bus evaluated) is timed as a reference.
+"""
+from random import Random
+from time import perf_counter
+
+import flote as ft
+
+CHAIN_LENGTH = 100
+SIZES = [1_000, 5_000, 10_000, 20_000]
+UPDATES = 200
+
+
+def make_design(n_buses: int) -> str:
+    n_chains = n_buses // CHAIN_LENGTH
+    lines = ['main comp Chains {', f'    in bit x[{n_chains}];', '    in bit en;']
+
+    for chain in range(n_chains):
+        lines.append(f'    bit c{chain}_0 = x[{chain}] xor en;')
+
+        for link in range(1, CHAIN_LENGTH):
+            lines.append(f'    bit c{chain}_{link} = not c{chain}_{link - 1};')
+
+    lines.append('}')
+
+    return '\n'.join(lines)
+
+
+def bench(n_buses: int) -> None:
+    rng = Random(n_buses)
+    n_chains = n_buses // CHAIN_LENGTH
+
+    start = perf_counter()
+    test_bench = ft.elaborate(make_design(n_buses), rust_backend=False)
+    elaboration_time = perf_counter() - start
+
+    component = test_bench.component
+    value = [rng.choice('01') for _ in range(n_chains)]
+
+    start = perf_counter()
+    for _ in range(UPDATES):
+        flipped = rng.randrange(n_chains)
+        value[flipped] = '1' if value[flipped] == '0' else '0'
+        component.update_signals({'x': ''.join(value)})
+    update_time = (perf_counter() - start) / UPDATES
+
+    start = perf_counter()
+    component.settle()
+    settle_time = perf_counter() - start
+
+    print(
+        f'{len(component.buses):>8} buses | elaboration {elaboration_time:8.3f} s | '
+        f'update {update_time * 1e3:8.3f} ms | full settle {settle_time * 1e3:9.3f} ms'
+    )
+
+
+if __name__ == '__main__':
+    for size in SIZES:
+        bench(size)
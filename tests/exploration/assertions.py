@@ -0,0 +1,105 @@
+import flote as ft
+from flote.frontend.builder import SemanticalError
+
+HALF_ADDER = '''
+comp HalfAdder {
+    in bit a;
+    in bit b;
+    out bit sum = a xor b;
+    out bit carry = a and b;
+
+    assert not carry;
+}
+
+main comp Top {
+    in bit x;
+    in bit y;
+    out bit s;
+    sub HalfAdder as ha;
+
+    ha.a = x;
+    ha.b = y;
+    s = ha.sum;
+
+    assert not (x and y); assert x or y or not s;
+}
+'''
+
+AND_GATE = '''
+main comp AndGate {
+    in bit a;
+    in bit b;
+    out bit y = a and b;
+
+    assert y;
+}
+'''
+
+
+def test_failures():
+    bench = ft.elaborate(HALF_ADDER)
+    assert sorted(bench.monitors.monitors) == ['assert@21', 'assert@21_2', 'ha.assert@8']
+    # The assertions are not outputs
+    outputs = bench.get_outputs(['x', 'y'])
+    assert 's' in outputs and not any('assert@' in id for id in outputs)
+
+    for x, y in [('0', '0'), ('1', '0'), ('1', '1'), ('0', '1'), ('1', '1')]:
+        bench.update({'x': x, 'y': y})
+        bench.wait(10)
+
+    assert [(failure.time, failure.monitor) for failure in bench.failures] == [
+        (20, 'assert@21'), (20, 'ha.assert@8'), (40, 'assert@21'), (40, 'ha.assert@8')
+    ]
+
+
+def test_initial_failure():
+    # An assertion that never holds is reported even if its bus never changes
+    bench = ft.elaborate(AND_GATE)
+    bench.update({'a': '0'})
+    bench.update({'b': '0'})
+    bench.update({'a': '1'})
+    assert [(failure.time, failure.monitor) for failure in bench.failures] == [(0, 'assert@7')]
+
+    bench = ft.elaborate(AND_GATE)
+    list(bench.sweep())
+    assert len(bench.failures) == 1
+
+
+def test_monitor():
+    bench = ft.elaborate(HALF_ADDER)
+    bench.monitor('s_needs_x', ['s', 'x'], lambda s, x: not (s and not x))
+
+    try:
+        bench.monitor('s_needs_x', ['s'], bool)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('The monitor was added twice')
+
+    bench.update({'x': '0', 'y': '1'})
+    bench.wait(5)
+    bench.update({'x': '1', 'y': '0'})
+    assert [(failure.time, failure.values) for failure in bench.failures] == [
+        (0, {'s': 1, 'x': 0})
+    ]
+
+
+def test_wide_assertion():
+    try:
+        ft.elaborate('main comp Wide { in bit a[2]; assert a; }')
+    except SemanticalError:
+        pass
+    else:
+        raise AssertionError('An assertion of 2 bits was accepted')
+
+
+def test_assertions():
+    test_failures()
+    test_initial_failure()
+    test_monitor()
+    test_wide_assertion()
+    print('The assertions were checked')
+
+
+if __name__ == '__main__':
+    test_assertions()
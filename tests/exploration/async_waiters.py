@@ -0,0 +1,74 @@
+import asyncio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import flote as ft
+from flote.stimulus import StimulusWriter
+
+BASE_DIR = Path(__file__).parent.parent.parent
+TESTS_DIR = BASE_DIR / 'tests'
+
+
+def get_bench() -> ft.AsyncTestBench:
+    bench = ft.AsyncTestBench(ft.elaborate_file(TESTS_DIR / 'duts' / 'ByteAndGate.ft'))
+    bench.port('b').write(0b11111111)
+
+    return bench
+
+
+async def wait_for_in_play():
+    # The output goes through 1, 2 and 3 in a single play, the coroutine resumes at the end
+    bench = get_bench()
+    waiter = asyncio.create_task(bench.wait_for('y', 2))
+    await asyncio.sleep(0)
+
+    with TemporaryDirectory() as dir:
+        file_path = Path(dir) / 'counter.stim'
+
+        with StimulusWriter(file_path, {'a': 8}, delays=True) as writer:
+            for value in [1, 2, 3]:
+                writer.write({'a': value}, 10)
+
+        bench.play(file_path)
+
+    assert await asyncio.wait_for(waiter, 1) == 10
+    assert bench.read('y') == 3
+
+
+async def wait_for_in_port_writes():
+    bench = get_bench()
+    waiter = asyncio.create_task(bench.wait_for('y', 2))
+    changed = asyncio.create_task(bench.changed('y'))
+    await asyncio.sleep(0)
+
+    port = bench.port('a')
+
+    for value in [1, 2, 3]:
+        port.write(value)
+        bench.bench.wait(5)
+
+    assert await asyncio.wait_for(waiter, 1) == 5
+    assert await asyncio.wait_for(changed, 1) == 1
+
+
+async def wait_for_in_updates():
+    bench = get_bench()
+    waiter = asyncio.create_task(bench.wait_for('y', 0b10000000))
+    await asyncio.sleep(0)
+
+    for value in ['00000001', '10000000', '00000000']:
+        bench.apply({'a': value})
+        bench.bench.wait(10)
+
+    assert await asyncio.wait_for(waiter, 1) == 10
+
+
+def test_async_waiters():
+    asyncio.run(wait_for_in_play())
+    asyncio.run(wait_for_in_port_writes())
+    asyncio.run(wait_for_in_updates())
+    print('The waiters saw every value')
+
+
+if __name__ == '__main__':
+    test_async_waiters()
@@ -0,0 +1,113 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import flote as ft
+from flote.stimulus import HEADER, StimulusError, StimulusFile, StimulusWriter, write_stimulus
+from flote.testbench import TestBench
+
+BASE_DIR = Path(__file__).parent.parent.parent
+TESTS_DIR = BASE_DIR / 'tests'
+
+INPUTS = {
+    'a': [0, 1, 1, 0, 1, 1, 0, 0],
+    'b': [0, 0, 1, 1, 1, 0, 0, 1],
+    'cin': [1, 0, 0, 1, 1, 1, 0, 0],
+}
+DELAYS = [10, 5, 0, 20, 10, 10, 5, 1]
+
+
+def get_bench() -> TestBench:
+    return ft.elaborate_file(TESTS_DIR / 'duts' / 'FullAdder.ft')
+
+
+def test_play(dir: Path):
+    # Playing a file records the same waves as updating the inputs row by row
+    file_path = dir / 'full_adder.stim'
+    write_stimulus(file_path, INPUTS, {'a': 1, 'b': 1, 'cin': 1}, DELAYS)
+
+    with StimulusFile(file_path) as stimulus:
+        assert len(stimulus) == len(DELAYS)
+        rows = list(stimulus)
+
+    expected = get_bench()
+
+    for delay, values in rows:
+        expected.update({id: str(value) for id, value in values.items()})
+        expected.wait(delay)
+
+    played = get_bench()
+    assert played.play(file_path) == len(DELAYS)
+    assert played.s_time == expected.s_time == sum(DELAYS)
+    assert list(played.waves.iter_changes()) == list(expected.waves.iter_changes())
+
+    # Without recording, the values and the time are the same
+    unrecorded = get_bench()
+    unrecorded.play(file_path, record=False)
+    assert unrecorded.s_time == expected.s_time
+    assert unrecorded.get_values() == expected.get_values()
+    assert len(unrecorded.waves) == 0
+
+
+def test_monitors(dir: Path):
+    # The monitors see every row, even when the change is undone by the next one
+    file_path = dir / 'carry.stim'
+
+    with StimulusWriter(file_path, {'a': 1, 'b': 1}, delays=True) as writer:
+        writer.write({'a': 1}, 10)
+        writer.write({'b': 1}, 10)
+        writer.write({'a': 0}, 10)
+
+    for record in [True, False]:
+        bench = get_bench()
+        bench.monitor('no_carry', ['cout'], lambda cout: not cout)
+        bench.play(file_path, record)
+        assert [(failure.time, failure.monitor) for failure in bench.failures] == [
+            (10, 'no_carry')
+        ]
+
+
+def test_invalid_files(dir: Path):
+    # A file without inputs nor delays has no rows
+    file_path = dir / 'empty.stim'
+
+    with StimulusWriter(file_path, {}) as writer:
+        for _ in range(3):
+            writer.write({})
+
+    with StimulusFile(file_path) as stimulus:
+        assert len(stimulus) == 0
+
+    bench = get_bench()
+    assert bench.play(file_path) == 0
+    assert bench.play(file_path, record=False) == 0
+
+    # An input outside the rows is rejected instead of reading past them
+    file_path = dir / 'outside.stim'
+    metadata = json.dumps({'inputs': [['a', 1, 9]], 'row_bytes': 1}).encode()
+
+    with open(file_path, 'wb') as file:
+        file.write(HEADER.pack(b'FLST', 1, 0, 0, len(metadata)))
+        file.write(metadata)
+        file.write(bytes(4))
+
+    for play in [lambda: StimulusFile(file_path), lambda: get_bench().play(file_path)]:
+        try:
+            play()
+        except (StimulusError, RuntimeError) as error:
+            assert 'outside the rows' in str(error)
+        else:
+            raise AssertionError('The input outside the rows was not rejected')
+
+
+def test_stimulus_playback():
+    with TemporaryDirectory() as dir:
+        test_play(Path(dir))
+        test_monitors(Path(dir))
+        test_invalid_files(Path(dir))
+
+    print('The stimulus files were played as the updates')
+
+
+if __name__ == '__main__':
+    test_stimulus_playback()
@@ -0,0 +1,97 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import flote as ft
+from flote.vcd import VcdReader, VcdWriter
+
+BASE_DIR = Path(__file__).parent.parent.parent
+TESTS_DIR = BASE_DIR / 'tests'
+
+# The changes of a bus of 2 bits, with unknown bits and a value from an HLS component
+CHANGES = [
+    (0, {'a': '00', 'b': '0'}),
+    (10, {'a': 'x0'}),
+    (20, {'a': '11', 'b': 'z'}),
+    (30, {'a': '10', 'b': '1'}),
+    (40, {'a': '3.5'}),
+    (50, {'a': '01'}),
+]
+# The changes that VCD files can have, without the HLS value
+VCD_CHANGES = [(time, changes) for time, changes in CHANGES if time != 40]
+
+
+def write_changes(
+    sink: ft.WaveFileWriter | VcdWriter, changes_list: list = CHANGES, end_time: int = 60
+) -> None:
+    sink.open('top', {'a': 2, 'b': 1}, 'ns')
+
+    for time, changes in changes_list:
+        sink.write(time, changes)
+
+    sink.close(end_time)
+
+
+def test_text_values(dir: Path):
+    # Small blocks, so the key frames have text values too
+    for block_size in [1, 2, 1 << 16]:
+        file_path = dir / f'text_{block_size}.flwv'
+        write_changes(ft.WaveFileWriter(file_path, block_size=block_size))
+
+        with ft.WaveFileReader(file_path) as reader:
+            assert list(reader.iter_changes()) == CHANGES
+            assert list(reader.iter_changes(start=25, end=40)) == [
+                (25, {'a': '11', 'b': 'z'}), (30, {'a': '10', 'b': '1'}), (40, {'a': '3.5'})
+            ]
+
+        store = ft.WaveStore.load(file_path)
+        assert store.value_at('a', 15) == 'x0'
+        assert store.value_at('a', 55) == '01'
+
+
+def test_vcd_to_wave(dir: Path):
+    # A VCD file with unknown bits goes through the binary format without changes
+    vcd_path = dir / 'unknown.vcd'
+    wave_path = dir / 'unknown.flwv'
+    write_changes(VcdWriter(vcd_path), VCD_CHANGES)
+
+    with VcdReader(vcd_path) as reader:
+        reader.write_to(ft.WaveFileWriter(wave_path))
+
+    with ft.WaveFileReader(wave_path) as reader:
+        assert list(reader.iter_changes()) == VCD_CHANGES
+        assert reader.end_time == 60
+
+
+def test_replay(dir: Path):
+    # The waves of a simulation saved in both formats and replayed on a new one are the same
+    full_adder = ft.elaborate_file(TESTS_DIR / 'duts' / 'FullAdder.ft')
+
+    for i in range(8):
+        full_adder.update({'a': str(i >> 2), 'b': str(i >> 1 & 1), 'cin': str(i & 1)})
+        full_adder.wait(10)
+
+    full_adder.save_vcd(dir / 'FullAdder.vcd')
+    full_adder.save_wave(dir / 'FullAdder.flwv')
+
+    replayed = ft.elaborate_file(TESTS_DIR / 'duts' / 'FullAdder.ft')
+    replayed.replay(dir / 'FullAdder.vcd')
+
+    with ft.WaveFileReader(dir / 'FullAdder.flwv') as reader:
+        expected = list(reader.iter_changes())
+
+    assert list(replayed.waves.iter_changes()) == list(full_adder.waves.iter_changes())
+    assert list(replayed.waves.iter_changes()) == expected
+    assert replayed.s_time == full_adder.s_time
+
+
+def test_wave_files():
+    with TemporaryDirectory() as dir:
+        test_text_values(Path(dir))
+        test_vcd_to_wave(Path(dir))
+        test_replay(Path(dir))
+
+    print('The waveform files kept all the changes')
+
+
+if __name__ == '__main__':
+    test_wave_files()